@@ -1,7 +1,11 @@
 # collectors.py
 import time
+import heapq
+import itertools
+import queue as queue_module
 import psutil
 import random
+import socket
 import threading
 from datetime import datetime
 
@@ -10,12 +14,15 @@ class BaseCollector:
         self.queue = queue
         self.interval = interval
         self.is_running = False
+        self._stopped = threading.Event()
 
     def collect(self):
         pass
 
     def run(self):
+        """단독 스레드로 실행할 때 사용 (여러 수집기는 CollectorScheduler 권장)"""
         self.is_running = True
+        self._stopped.clear()
         while self.is_running:
             try:
                 data = self.collect()
@@ -23,18 +30,170 @@ class BaseCollector:
                     self.queue.put(data)
             except Exception as e:
                 print(f"❌ {self.__class__.__name__} 오류: {e}")
-            time.sleep(self.interval)
+            self._stopped.wait(self.interval)  # stop() 즉시 깨어남
 
     def stop(self):
         self.is_running = False
+        self._stopped.set()
+
+
+# ---------------------------------------------------------
+# 0. [Scheduler] 단일 스레드 수집기 스케줄러
+# ---------------------------------------------------------
+class CollectorScheduler:
+    """
+    여러 수집기를 스레드 하나에서 각자의 주기로 실행합니다. (수집기 수만큼 스레드를 만들지 않음)
+
+    - 타이머 힙: 다음 실행 시각이 가장 이른 수집기만 기다렸다가 실행
+    - 드리프트 보정: 다음 실행 시각은 '끝난 시각 + interval'이 아니라 '예정 시각 + interval'
+      (collect()가 밀려 주기를 놓치면 밀린 횟수만큼 몰아서 실행하지 않고 건너뜀)
+    - 지터: 예정 시각에 ±jitter*interval 만큼 흔들어 같은 주기의 수집기가 한꺼번에 몰리지 않게 함
+    - stop(): 대기 중이어도 즉시 깨어나 종료, start()로 등록된 수집기 전체를 다시 예약하여 재시작
+    - 대기열이 가득 차면 스케줄러가 멈추지 않도록 해당 항목은 버리고 dropped로 집계
+    """
+
+    def __init__(self, collectors=(), jitter=0.1):
+        self.jitter = jitter
+        self._heap = []  # (실행 시각, 순번, 기준 시각, 수집기)
+        self._collectors = []  # 등록된 수집기 (재시작 시 힙을 다시 만드는 기준)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {}
+        for collector in collectors:
+            self.add(collector)
+
+    def _jittered(self, base, interval):
+        return base + random.uniform(-self.jitter, self.jitter) * interval
+
+    def _schedule_first(self, collector):
+        """첫 실행은 0~interval 사이로 분산 (_cond를 잡은 상태에서 호출)"""
+        base = time.monotonic() + random.uniform(0, collector.interval)
+        heapq.heappush(self._heap, (base, next(self._seq), base, collector))
+        collector.is_running = True
+
+    def add(self, collector):
+        """수집기 등록 (실행 중에도 가능)"""
+        with self._cond:
+            self._collectors.append(collector)
+            self._schedule_first(collector)
+            self._stats[collector] = {
+                "name": f"{collector.__class__.__name__}#{len(self._stats) + 1}", "interval": collector.interval, "runs": 0, "emitted": 0, "dropped": 0,
+                "errors": 0, "skipped": 0, "last_ms": 0.0, "max_ms": 0.0, "total_ms": 0.0,
+            }
+            self._cond.notify()
+
+    def remove(self, collector):
+        with self._cond:
+            self._collectors = [c for c in self._collectors if c is not collector]
+            self._heap = [entry for entry in self._heap if entry[3] is not collector]
+            heapq.heapify(self._heap)
+            collector.is_running = False
+            self._cond.notify()
+
+    @property
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running:
+            return self._thread
+        with self._cond:
+            # stop() 이후 재시작: 실행 중이던 것까지 포함해 등록된 수집기 전체를 다시 예약
+            self._heap = []
+            for collector in self._collectors:
+                self._schedule_first(collector)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="collector-scheduler")
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        with self._cond:
+            # 힙 밖에서 collect() 중인 수집기도 표시되어 _reschedule에서 다시 들어가지 않음
+            for collector in self._collectors:
+                collector.is_running = False
+            self._cond.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _next_due(self):
+        """실행할 차례가 된 수집기를 꺼냄. 종료 시 None"""
+        with self._cond:
+            while not self._stop.is_set():
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.monotonic()
+                if delay <= 0:
+                    return heapq.heappop(self._heap)
+                self._cond.wait(delay)
+            return None
+
+    def _reschedule(self, base, collector):
+        interval = collector.interval
+        now = time.monotonic()
+        base += interval
+        if base < now:
+            # 주기를 놓쳤으면 밀린 실행은 건너뛰고 다음 주기 경계에 맞춤
+            missed = int((now - base) // interval) + 1
+            base += missed * interval
+            self._stats[collector]["skipped"] += missed
+        with self._cond:
+            if collector.is_running:
+                heapq.heappush(self._heap, (self._jittered(base, interval), next(self._seq), base, collector))
+
+    def _run(self):
+        while True:
+            entry = self._next_due()
+            if entry is None:
+                return
+            _, _, base, collector = entry
+            stats = self._stats[collector]
+
+            started = time.monotonic()
+            try:
+                data = collector.collect()
+                if data:
+                    accepted = collector.queue.put(data, block=False)
+                    stats["emitted" if accepted is not False else "dropped"] += 1
+            except queue_module.Full:
+                stats["dropped"] += 1
+            except Exception as e:
+                stats["errors"] += 1
+                print(f"❌ {collector.__class__.__name__} 오류: {e}")
+            elapsed = (time.monotonic() - started) * 1000
+
+            stats["runs"] += 1
+            stats["last_ms"] = elapsed
+            stats["max_ms"] = max(stats["max_ms"], elapsed)
+            stats["total_ms"] += elapsed
+            self._reschedule(base, collector)
+
+    def stats(self):
+        """수집기별 실행 횟수 / 방출·폐기 건수 / collect() 지연(ms)"""
+        result = {}
+        for stats in list(self._stats.values()):
+            stats = dict(stats)
+            stats["avg_ms"] = stats["total_ms"] / stats["runs"] if stats["runs"] else 0.0
+            result[stats.pop("name")] = stats
+        return result
 
 # ---------------------------------------------------------
 # 1. [System] 실제 서버 메트릭 수집기 (최적화됨)
 # ---------------------------------------------------------
 class SystemMetricCollector(BaseCollector):
-    def __init__(self, queue, interval=10):
+    """
+    sink(MetricBatchWriter 등)를 주면 수치를 구조화된 레코드로 sink에 바로 넘기고 대기열에는 넣지 않습니다.
+    (메트릭은 LLM 추출을 거치지 않음) sink가 없으면 기존처럼 문장으로 만들어 대기열에 넣습니다.
+    """
+    def __init__(self, queue, interval=10, sink=None, host=None):
         super().__init__(queue, interval)
         self.last_cpu = 0  # 이전 CPU 값 저장용
+        self.sink = sink
+        self.host = host or socket.gethostname()
 
     def collect(self):
         cpu_usage = psutil.cpu_percent(interval=None)
@@ -45,12 +204,21 @@ class SystemMetricCollector(BaseCollector):
             return None 
 
         self.last_cpu = cpu_usage
+        level = "CRITICAL" if cpu_usage > 50 else "NORMAL"
+
+        if self.sink is not None:
+            self.sink.add({
+                "host": self.host,
+                "timestamp": time.time(),
+                "cpu": float(cpu_usage),
+                "mem": float(memory.percent),
+                "level": level,
+            })
+            return None
 
-        if cpu_usage > 50:
-            level = "CRITICAL" 
+        if level == "CRITICAL":
             msg = f"CPU 사용량이 {cpu_usage}%로 매우 높습니다. 시스템 과부하가 우려됩니다."
         else:
-            level = "NORMAL"
             msg = f"현재 CPU 사용량은 {cpu_usage}%, 메모리 사용량은 {memory.percent}%로 안정적입니다."
 
         timestamp = datetime.now().strftime("%H:%M:%S")
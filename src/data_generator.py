@@ -1,7 +1,77 @@
 import csv
+import time
 import random
 import shutil
 import os
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# 그룹별 직원 비율 (합이 1이 아니어도 비율로 정규화)
+DEFAULT_GROUP_WEIGHTS = {"SECURITY": 20, "IT": 30, "HR": 15, "EXECUTIVE": 10, "STAFF": 25}
+
+HR_COLUMNS = ["id", "name", "age", "gender", "role", "team", "company", "group", "major", "certifications"]
+ACTOR_COLUMNS = ["id", "name", "age", "gender", "role", "team", "company", "group"]
+ACTION_COLUMNS = ["category", "target_group", "location", "action", "source"]
+EVENT_COLUMNS = ["timestamp", "actor_id", "target_id", "category", "location", "action", "source"]
+
+ACTIONS = [
+    {"category": "SEC", "target_group": "IT", "location": "서버실", "action": "보안 USB를 꽂고 데이터를 다운로드함", "source": "보안 로그"},
+    {"category": "SEC", "target_group": "SUSPECT", "location": "지하 주차장", "action": "검은색 가방을 트렁크에 싣는 모습이 포착됨", "source": "CCTV"},
+    {"category": "SEC", "target_group": "EXECUTIVE", "location": "강남 비밀 클럽", "action": "경쟁사 임원과 은밀히 만남", "source": "흥신소 제보"},
+    {"category": "HR", "target_group": "HR", "location": "인사팀 상담실", "action": "연봉 협상 테이블을 엎고 나감", "source": "CCTV"},
+    {"category": "HR", "target_group": "ALL", "location": "흡연실", "action": "팀장에 대한 욕설을 하며 담배를 피움", "source": "동료 직원 면담"},
+    {"category": "RELATION", "target_group": "ALL", "location": "구내식당", "action": "함께 점심을 먹으며 웃고 떠듦 (친밀도 상승)", "source": "동료 목격담"},
+    {"category": "RELATION", "target_group": "ALL", "location": "휴게실", "action": "서로의 뒷담화를 하다가 언성이 높아짐 (갈등 발생)", "source": "CCTV"},
+    {"category": "RELATION", "target_group": "IT", "location": "개발팀 회의실", "action": "서로의 코드를 리뷰해주며 칭찬함 (협력)", "source": "팀장 관찰 기록"},
+    {"category": "RELATION", "target_group": "SUSPECT", "location": "비상계단", "action": "은밀하게 쪽지를 건네고 헤어짐 (의심)", "source": "청소부 제보"}
+]
+
+SUSPECTS = [
+    {"id": "suspect-001", "name": "신원미상", "age": 40, "gender": "남성", "role": "unknown", "team": "unknown", "company": "unknown", "group": "SUSPECT"},
+    {"id": "visitor-001", "name": "김방문", "age": 30, "gender": "여성", "role": "방문객", "team": "영업팀", "company": "협력사", "group": "VISITOR"}
+]
+
+
+class ChunkWriter:
+    """열 단위 chunk(dict: 컬럼 -> 값 목록)를 CSV 또는 Parquet 파일에 이어 씁니다."""
+
+    def __init__(self, path, columns, fmt="csv", encoding="utf-8"):
+        self.path = path
+        self.columns = columns
+        self.fmt = fmt
+        self.rows = 0
+        self._parquet = None
+        if fmt == "csv":
+            self._file = open(path, "w", newline="", encoding=encoding)
+            self._csv = csv.writer(self._file)
+            self._csv.writerow(columns)
+
+    def write(self, chunk):
+        values = [chunk[c] for c in self.columns]
+        if self.fmt == "csv":
+            self._csv.writerows(zip(*[v.tolist() if hasattr(v, "tolist") else v for v in values]))
+        else:
+            table = pa.table({c: v for c, v in zip(self.columns, values)})
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        self.rows += len(values[0])
+
+    def close(self):
+        if self.fmt == "csv":
+            self._file.close()
+        elif self._parquet is not None:
+            self._parquet.close()
 
 class DataGenerator:
     """
@@ -9,13 +79,17 @@ class DataGenerator:
     HR 데이터와 시뮬레이터 배우 데이터의 정합성을 보장합니다.
     """
     
-    def __init__(self, dummy_dir="dummy", total_count=50):
+    def __init__(self, dummy_dir="dummy", total_count=50, group_weights=None, seed=None):
         self.dummy_dir = dummy_dir
         self.dummy_hr_data = "hr_data.csv"
         self.dummy_actors_data = "actors.csv"
         self.dummy_actions_data = "actions.csv"
+        self.dummy_events_data = "events.csv"
 
         self.total_count = total_count
+        self.group_weights = dict(group_weights or DEFAULT_GROUP_WEIGHTS)
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.first_names = ["철수", "영희", "민수", "서호", "민석", "주영", "도원", "서원", "지원", "현우", "지민", "수진", "우성", "재석", "동엽", "경규", "나래", "세형", "구라", "흥국"]
         self.last_names = ["김", "이", "박", "최", "정", "강", "조", "윤", "장", "임", "한", "오", "서", "신", "권", "황", "안", "송", "류", "홍"]
         
@@ -44,7 +118,33 @@ class DataGenerator:
         }
 
     def generate_name(self):
-        return random.choice(self.last_names) + random.choice(self.first_names)
+        return self.generate_name_with(self.rng)
+
+    def generate_name_with(self, rng):
+        return rng.choice(self.last_names) + rng.choice(self.first_names)
+
+    def group_counts(self, total):
+        """group_weights 비율대로 total명을 그룹에 배분 (최대 나머지 방식, 합계가 정확히 total)"""
+        weight_sum = sum(self.group_weights.values())
+        exact = {g: total * w / weight_sum for g, w in self.group_weights.items()}
+        counts = {g: int(v) for g, v in exact.items()}
+        for g in sorted(exact, key=lambda g: exact[g] - counts[g], reverse=True)[:total - sum(counts.values())]:
+            counts[g] += 1
+        return counts
+
+    @staticmethod
+    def id_prefix(group):
+        if group == "SECURITY": return "sec"
+        if group == "EXECUTIVE": return "exec"
+        return group.lower()[:3]
+
+    @staticmethod
+    def role_for_age(age, senior_pick):
+        if age < 28: return "사원"
+        elif age < 33: return "대리"
+        elif age < 40: return "과장"
+        elif age < 47: return "차장"
+        return senior_pick
 
     def generate_all_data(self):
         """HR 데이터, Actor 데이터, Action 데이터를 한 번에 생성"""
@@ -61,32 +161,25 @@ class DataGenerator:
 
     def _create_hr_data(self):
         data = []
-        groups = (["SECURITY"] * 20 + ["IT"] * 30 + ["HR"] * 15 + ["EXECUTIVE"] * 10 + ["STAFF"] * 25)
-        while len(groups) < self.total_count: groups.append("STAFF")
-        random.shuffle(groups)
+        rng = self.rng
+        groups = [g for g, c in self.group_counts(self.total_count).items() for _ in range(c)]
+        rng.shuffle(groups)
 
-        counts = {"SECURITY": 0, "IT": 0, "HR": 0, "EXECUTIVE": 0, "STAFF": 0}
+        counts = {g: 0 for g in self.group_weights}
 
         for group in groups:
             counts[group] += 1
-            prefix = group.lower()[:3] if group != "SECURITY" else "sec"
-            if group == "EXECUTIVE": prefix = "exec"
-            user_id = f"{prefix}-{1000 + counts[group]}"
+            user_id = f"{self.id_prefix(group)}-{1000 + counts[group]}"
             
             name = self.generate_name()
-            age = random.randint(24, 58)
-            gender = random.choice(["남성", "여성"])
-
-            if age < 28: role = "사원"
-            elif age < 33: role = "대리"
-            elif age < 40: role = "과장"
-            elif age < 47: role = "차장"
-            else: role = random.choice(["부장", "상무", "전무"])
+            age = rng.randint(24, 58)
+            gender = rng.choice(["남성", "여성"])
+            role = self.role_for_age(age, rng.choice(["부장", "상무", "전무"]))
             
-            team = random.choice(self.teams[group])
-            major = random.choice(self.majors[group])
-            cert_count = random.choice([0, 1, 1, 2])
-            certs = ", ".join(random.sample(self.certs[group], k=cert_count)) if cert_count > 0 else "없음"
+            team = rng.choice(self.teams[group])
+            major = rng.choice(self.majors[group])
+            cert_count = rng.choice([0, 1, 1, 2])
+            certs = ", ".join(rng.sample(self.certs[group], k=cert_count)) if cert_count > 0 else "없음"
 
             row = {
                 "id": user_id, "name": name, "age": age, "gender": gender,
@@ -96,8 +189,7 @@ class DataGenerator:
             data.append(row)
 
         with open(f"{self.dummy_dir}/{self.dummy_hr_data}", "w", newline="", encoding="utf-8") as f:
-            fieldnames = ["id", "name", "age", "gender", "role", "team", "company", "group", "major", "certifications"]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer = csv.DictWriter(f, fieldnames=HR_COLUMNS)
             writer.writeheader()
             writer.writerows(data)
             
@@ -112,42 +204,223 @@ class DataGenerator:
                 "role": row["role"], "team": row["team"], "company": row["company"], "group": row["group"]
             })
             
-        suspects = [
-            {"id": "suspect-001", "name": "신원미상", "age": 40, "gender": "남성", "role": "unknown", "team": "unknown", "company": "unknown", "group": "SUSPECT"},
-            {"id": "visitor-001", "name": "김방문", "age": 30, "gender": "여성", "role": "방문객", "team": "영업팀", "company": "협력사", "group": "VISITOR"}
-        ]
-        actors.extend(suspects)
+        actors.extend(SUSPECTS)
 
         with open(f"{self.dummy_dir}/{self.dummy_actors_data}", "w", newline="", encoding="utf-8-sig") as f :
-            fieldnames = ["id", "name", "age", "gender", "role", "team", "company", "group"]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer = csv.DictWriter(f, fieldnames=ACTOR_COLUMNS)
             writer.writeheader()
             writer.writerows(actors)
             
         print(f"   - {self.dummy_actors_data} 생성 완료 ({len(actors)}명 - 직원+외부인)")
 
     def _create_actions_data(self):
-        actions = [
-            {"category": "SEC", "target_group": "IT", "location": "서버실", "action": "보안 USB를 꽂고 데이터를 다운로드함", "source": "보안 로그"},
-            {"category": "SEC", "target_group": "SUSPECT", "location": "지하 주차장", "action": "검은색 가방을 트렁크에 싣는 모습이 포착됨", "source": "CCTV"},
-            {"category": "SEC", "target_group": "EXECUTIVE", "location": "강남 비밀 클럽", "action": "경쟁사 임원과 은밀히 만남", "source": "흥신소 제보"},
-            {"category": "HR", "target_group": "HR", "location": "인사팀 상담실", "action": "연봉 협상 테이블을 엎고 나감", "source": "CCTV"},
-            {"category": "HR", "target_group": "ALL", "location": "흡연실", "action": "팀장에 대한 욕설을 하며 담배를 피움", "source": "동료 직원 면담"},
-            {"category": "RELATION", "target_group": "ALL", "location": "구내식당", "action": "함께 점심을 먹으며 웃고 떠듦 (친밀도 상승)", "source": "동료 목격담"},
-            {"category": "RELATION", "target_group": "ALL", "location": "휴게실", "action": "서로의 뒷담화를 하다가 언성이 높아짐 (갈등 발생)", "source": "CCTV"},
-            {"category": "RELATION", "target_group": "IT", "location": "개발팀 회의실", "action": "서로의 코드를 리뷰해주며 칭찬함 (협력)", "source": "팀장 관찰 기록"},
-            {"category": "RELATION", "target_group": "SUSPECT", "location": "비상계단", "action": "은밀하게 쪽지를 건네고 헤어짐 (의심)", "source": "청소부 제보"}
-        ]
-        extended_actions = actions * 3 
+        extended_actions = ACTIONS * 3 
 
         with open(f"{self.dummy_dir}/{self.dummy_actions_data}", "w", newline="", encoding="utf-8-sig") as f:
-            fieldnames = ["category", "target_group", "location", "action", "source"]
-            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer = csv.DictWriter(f, fieldnames=ACTION_COLUMNS)
             writer.writeheader()
             writer.writerows(extended_actions)
             
         print(f"  - {self.dummy_actions_data} 생성 완료 ({len(extended_actions)}개 패턴)")
     
+    # -------------------------------------------------
+    # [Bulk] 대량 합성 데이터 (부하 테스트용)
+    # -------------------------------------------------
+    def generate_bulk(self, count, events=0, chunk_size=100_000, fmt="csv", seed=None, days=180, end=None):
+        """
+        직원 count명(hr_data/actors)과 시나리오 이벤트 events건(events)을 chunk_size 단위로 생성하여 바로 파일에 씁니다.
+        - NumPy가 있으면 chunk 단위 벡터화 샘플링, 없으면 같은 규칙의 파이썬 루프로 생성
+        - fmt="parquet"은 pyarrow가 있을 때만 사용 (없으면 CSV) / HR 적재([5])는 CSV만 읽습니다.
+        - 반환값은 실제로 기록한 직원 파일 경로입니다. (fmt에 따라 .csv / .parquet)
+        - seed를 주면 같은 입력에 대해 항상 같은 파일이 만들어집니다.
+          이벤트 시각은 end 이전 days일 사이에 분포하며, end를 생략하면 오늘 0시 기준이라
+          실행 날짜가 바뀌면 같은 seed라도 이벤트 시각이 달라집니다. (재현이 필요하면 end를 지정)
+        """
+        if fmt == "parquet" and pq is None:
+            print("  [Factory] pyarrow가 없어 CSV로 생성합니다.")
+            fmt = "csv"
+        ext = "parquet" if fmt == "parquet" else "csv"
+        seed = self.seed if seed is None else seed
+        rng = np.random.default_rng(seed) if np is not None else random.Random(seed)
+        os.makedirs(self.dummy_dir, exist_ok=True)
+
+        print(f"🏭 [Factory] 대량 생성 시작: 직원 {count}명 / 이벤트 {events}건 "
+              f"(chunk {chunk_size}, {ext}, {'numpy' if np is not None else 'python'}, seed={seed})")
+
+        groups = list(self.group_weights)
+        counters = [0] * len(groups)
+        # 이벤트 생성 시 직원을 다시 만들 필요 없이 (그룹, 순번)으로 ID를 복원
+        member_groups, member_ordinals = [], []
+
+        started = time.monotonic()
+        hr_writer = ChunkWriter(self._bulk_path(self.dummy_hr_data, ext), HR_COLUMNS, fmt)
+        actor_writer = ChunkWriter(self._bulk_path(self.dummy_actors_data, ext), ACTOR_COLUMNS, fmt, encoding="utf-8-sig")
+        try:
+            for offset in range(0, count, chunk_size):
+                chunk, group_codes, ordinals = self._hr_chunk(min(chunk_size, count - offset), rng, groups, counters)
+                hr_writer.write(chunk)
+                actor_writer.write(chunk)
+                member_groups.append(group_codes)
+                member_ordinals.append(ordinals)
+                self._report("직원", hr_writer.rows, count, started)
+            actor_writer.write({c: [row[c] for row in SUSPECTS] for c in ACTOR_COLUMNS})
+        finally:
+            hr_writer.close()
+            actor_writer.close()
+        self._create_actions_data()
+
+        if events:
+            if np is not None:
+                member_groups, member_ordinals = np.concatenate(member_groups), np.concatenate(member_ordinals)
+            else:
+                member_groups = [g for part in member_groups for g in part]
+                member_ordinals = [o for part in member_ordinals for o in part]
+            ids = (groups, member_groups, member_ordinals)
+            if end is None:
+                end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+                if seed is not None:
+                    print(f"  [Factory] end 미지정: 이벤트 시각이 실행 날짜({end:%Y-%m-%d}) 기준입니다. (재현하려면 end 지정)")
+            window = (int(end.timestamp()), days)
+
+            started = time.monotonic()
+            event_writer = ChunkWriter(self._bulk_path(self.dummy_events_data, ext), EVENT_COLUMNS, fmt, encoding="utf-8-sig")
+            try:
+                for offset in range(0, events, chunk_size):
+                    event_writer.write(self._event_chunk(min(chunk_size, events - offset), rng, ids, window))
+                    self._report("이벤트", event_writer.rows, events, started)
+            finally:
+                event_writer.close()
+
+        print(f" [Factory] 대량 생성 완료 ({self.dummy_dir}/)")
+        return hr_writer.path
+
+    def _bulk_path(self, filename, ext):
+        return os.path.join(self.dummy_dir, f"{os.path.splitext(filename)[0]}.{ext}")
+
+    @staticmethod
+    def _report(label, done, total, started):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        print(f"   - {label} {done}/{total} ({done / elapsed:,.0f}건/s)")
+
+    def _format_ids(self, groups, group_codes, ordinals):
+        prefixes = [self.id_prefix(g) for g in groups]
+        return [f"{prefixes[g]}-{1000 + o}" for g, o in zip(group_codes, ordinals)]
+
+    def _hr_chunk(self, n, rng, groups, counters):
+        """직원 n명 chunk. (컬럼 dict, 그룹 코드, 그룹 내 순번) 반환"""
+        weights = [self.group_weights[g] for g in groups]
+        seniors = ["부장", "상무", "전무"]
+
+        if np is None:
+            codes = rng.choices(range(len(groups)), weights=weights, k=n)
+            ordinals, rows = [], []
+            for code in codes:
+                counters[code] += 1
+                ordinals.append(counters[code])
+                group = groups[code]
+                age = rng.randint(24, 58)
+                cert_count = rng.choice([0, 1, 1, 2])
+                rows.append({
+                    "name": self.generate_name_with(rng), "age": age, "gender": rng.choice(["남성", "여성"]),
+                    "role": self.role_for_age(age, rng.choice(seniors)),
+                    "team": rng.choice(self.teams[group]), "major": rng.choice(self.majors[group]),
+                    "certifications": ", ".join(rng.sample(self.certs[group], k=cert_count)) or "없음",
+                })
+            chunk = {c: [row[c] for row in rows] for c in ["name", "age", "gender", "role", "team", "major", "certifications"]}
+        else:
+            p = np.asarray(weights, dtype=float) / sum(weights)
+            codes = rng.choice(len(groups), size=n, p=p)
+            ordinals = np.empty(n, dtype=np.int64)
+            age = rng.integers(24, 59, size=n)
+            team = np.empty(n, dtype=object)
+            major = np.empty(n, dtype=object)
+            cert_count = np.array([0, 1, 1, 2])[rng.integers(0, 4, size=n)]
+            certs = np.empty(n, dtype=object)
+
+            for code, group in enumerate(groups):
+                mask = codes == code
+                k = int(mask.sum())
+                if not k:
+                    continue
+                ordinals[mask] = counters[code] + 1 + np.arange(k)
+                counters[code] += k
+                team[mask] = np.asarray(self.teams[group], dtype=object)[rng.integers(0, len(self.teams[group]), size=k)]
+                major[mask] = np.asarray(self.majors[group], dtype=object)[rng.integers(0, len(self.majors[group]), size=k)]
+                # 행마다 자격증 순서를 무작위로 섞고 앞에서 cert_count개 선택 (중복 없는 표본)
+                pool = np.asarray(self.certs[group], dtype=object)
+                order = np.argsort(rng.random((k, len(pool))), axis=1)
+                picked = pool[order[:, :2]]
+                certs[mask] = [", ".join(row[:c]) or "없음" for row, c in zip(picked.tolist(), cert_count[mask].tolist())]
+
+            names = np.char.add(
+                np.asarray(self.last_names)[rng.integers(0, len(self.last_names), size=n)],
+                np.asarray(self.first_names)[rng.integers(0, len(self.first_names), size=n)],
+            )
+            role = np.select(
+                [age < 28, age < 33, age < 40, age < 47],
+                ["사원", "대리", "과장", "차장"],
+                default=np.asarray(seniors)[rng.integers(0, 3, size=n)],
+            )
+            chunk = {
+                "name": names, "age": age, "gender": np.asarray(["남성", "여성"])[rng.integers(0, 2, size=n)],
+                "role": role, "team": team, "major": major, "certifications": certs,
+            }
+
+        chunk["id"] = self._format_ids(groups, codes.tolist() if np is not None else codes,
+                                       ordinals.tolist() if np is not None else ordinals)
+        chunk["group"] = [groups[c] for c in (codes.tolist() if np is not None else codes)]
+        chunk["company"] = ["대현그룹"] * n
+        return chunk, codes, ordinals
+
+    def _event_chunk(self, n, rng, ids, window):
+        """시나리오 이벤트 n건 chunk (그룹에 맞는 행동, 관계형이면 본인이 아닌 상대 포함)"""
+        groups, member_groups, member_ordinals = ids
+        total = len(member_groups)
+        now, days = window
+        # 그룹 -> 가능한 행동 인덱스 (target_group이 ALL이거나 같은 그룹)
+        by_group = [
+            [i for i, a in enumerate(ACTIONS) if a["target_group"] in ("ALL", g)] or list(range(len(ACTIONS)))
+            for g in groups
+        ]
+
+        if np is None:
+            actors = [rng.randrange(total) for _ in range(n)]
+            scenes = [rng.choice(by_group[member_groups[a]]) for a in actors]
+            partners = []
+            for a, scene in zip(actors, scenes):
+                if total > 1 and (ACTIONS[scene]["category"] == "RELATION" or rng.random() < 0.3):
+                    b = rng.randrange(total - 1)
+                    partners.append(b + (b >= a))
+                else:
+                    partners.append(-1)
+            seconds = [now - rng.randrange(days * 86400) for _ in range(n)]
+        else:
+            actors = rng.integers(0, total, size=n)
+            actor_groups = member_groups[actors]
+            scenes = np.empty(n, dtype=np.int64)
+            for code, options in enumerate(by_group):
+                mask = actor_groups == code
+                scenes[mask] = np.asarray(options)[rng.integers(0, len(options), size=int(mask.sum()))]
+            is_relation = np.asarray([a["category"] == "RELATION" for a in ACTIONS])[scenes] | (rng.random(n) < 0.3)
+            partners = rng.integers(0, max(total - 1, 1), size=n)
+            partners = partners + (partners >= actors)
+            partners = np.where(is_relation & (total > 1), partners, -1)
+            seconds = now - rng.integers(0, days * 86400, size=n)
+            actors, scenes, partners, seconds = actors.tolist(), scenes.tolist(), partners.tolist(), seconds.tolist()
+
+        def member_id(i):
+            return f"{self.id_prefix(groups[int(member_groups[i])])}-{1000 + int(member_ordinals[i])}"
+
+        return {
+            "timestamp": [datetime.fromtimestamp(t).strftime("%Y-%m-%d %H:%M:%S") for t in seconds],
+            "actor_id": [member_id(a) for a in actors],
+            "target_id": [member_id(b) if b >= 0 else "" for b in partners],
+            "category": [ACTIONS[i]["category"] for i in scenes],
+            "location": [ACTIONS[i]["location"] for i in scenes],
+            "action": [ACTIONS[i]["action"] for i in scenes],
+            "source": [ACTIONS[i]["source"] for i in scenes],
+        }
+
     def clear(self):
         if os.path.exists(self.dummy_dir):
             shutil.rmtree(self.dummy_dir)
\ No newline at end of file
@@ -0,0 +1,196 @@
+import json
+import os
+import re
+import sqlite3
+import hashlib
+import threading
+import time
+
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+from langchain_core.documents import Document
+
+# 문장 앞의 수집 시각 ([2025-12-29 10:00:00] / [10:00:00]) - 캐시 키에서는 제외합니다.
+_TIMESTAMP = re.compile(r"^\s*\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}|\d{2}:\d{2}:\d{2})\]\s*")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def split_timestamp(text):
+    """(선두 타임스탬프, 정규화된 본문) 반환. 타임스탬프가 없으면 None."""
+    match = _TIMESTAMP.match(text)
+    timestamp = match.group(1) if match else None
+    body = text[match.end():] if match else text
+    return timestamp, _WHITESPACE.sub(" ", body).strip()
+
+
+class ExtractionCache:
+    """
+    [LLM 추출 결과 캐시]
+    (정규화된 본문, 스키마 버전, 모델명)을 키로 GraphDocument를 SQLite에 저장합니다.
+    같은 내용의 제보가 다시 들어오면 LLM 호출 없이 저장된 추출 결과를 재사용합니다.
+
+    - 정규화: 선두 타임스탬프 제거 + 공백 정리 (시각만 다른 반복 제보도 적중)
+    - 적중 시 저장 당시 타임스탬프가 들어간 값은 새 제보의 타임스탬프로 치환
+    - 최근 사용 시각(LRU) 기준으로 건수/용량 한도를 넘는 항목부터 제거
+    - 스키마 버전이 키에 포함되므로 스키마가 바뀌면 이전 항목은 자동으로 적중하지 않으며,
+      invalidate()로 물리적으로도 정리합니다.
+    """
+
+    def __init__(self, path="src/extraction_cache.db", max_entries=5000, max_bytes=32 * 1024 * 1024):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                schema_version TEXT NOT NULL,
+                model TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_used ON entries(last_used)")
+        self._count, self._bytes = self._conn.execute(
+            "SELECT count(*), coalesce(sum(size), 0) FROM entries"
+        ).fetchone()
+
+    @staticmethod
+    def make_key(body, schema_version, model):
+        raw = f"{schema_version}\x1f{model}\x1f{body}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, text, schema_version, model, metadata=None):
+        """캐시 적중 시 GraphDocument, 아니면 None"""
+        timestamp, body = split_timestamp(text)
+        key = self.make_key(body, schema_version, model)
+
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM entries WHERE key = ?", (key,)).fetchone()
+            if not row:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (time.time(), key))
+
+        return self._deserialize(row[0], text, timestamp, metadata or {})
+
+    def put(self, text, schema_version, model, graph_document):
+        timestamp, body = split_timestamp(text)
+        key = self.make_key(body, schema_version, model)
+        payload = self._serialize(graph_document, timestamp)
+        size = len(payload.encode("utf-8"))
+
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, schema_version, model, payload, size, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, schema_version, model, payload, size, time.time())
+            )
+            if old:
+                self._bytes -= old[0]
+            else:
+                self._count += 1
+            self._bytes += size
+            self._evict()
+
+    def _evict(self):
+        """건수/용량 한도를 넘으면 가장 오래 사용되지 않은 항목부터 제거"""
+        while self._count > self.max_entries or self._bytes > self.max_bytes:
+            overflow = max(self._count - self.max_entries, 1)
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY last_used LIMIT ?", (overflow,)
+            ).fetchall()
+            if not rows:
+                break
+            self._conn.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k, _ in rows])
+            self._count -= len(rows)
+            self._bytes -= sum(size for _, size in rows)
+
+    def invalidate(self, schema_version):
+        """현재 스키마 버전이 아닌 항목을 모두 삭제합니다."""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM entries WHERE schema_version != ?", (schema_version,)
+            ).rowcount
+            self._count, self._bytes = self._conn.execute(
+                "SELECT count(*), coalesce(sum(size), 0) FROM entries"
+            ).fetchone()
+        if removed:
+            print(f"  [Cache] 스키마 변경으로 추출 캐시 {removed}건을 무효화했습니다.")
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": self._count,
+            "bytes": self._bytes,
+        }
+
+    # ------------------------------------------------------------------
+    # 직렬화
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _serialize(graph_document, timestamp):
+        data = {
+            "timestamp": timestamp,
+            "nodes": [
+                {"id": n.id, "type": n.type, "properties": n.properties}
+                for n in graph_document.nodes
+            ],
+            "relationships": [
+                {
+                    "source": {"id": r.source.id, "type": r.source.type},
+                    "target": {"id": r.target.id, "type": r.target.type},
+                    "type": r.type,
+                    "properties": r.properties,
+                }
+                for r in graph_document.relationships
+            ],
+        }
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+    @staticmethod
+    def _deserialize(payload, text, timestamp, metadata):
+        data = json.loads(payload)
+        old_ts = data.get("timestamp")
+
+        def restamp(value):
+            # 저장 당시의 타임스탬프를 이번 제보의 타임스탬프로 치환
+            if old_ts and timestamp and isinstance(value, str):
+                return value.replace(old_ts, timestamp)
+            return value
+
+        def restamp_props(props):
+            return {k: restamp(v) for k, v in props.items()}
+
+        nodes = [
+            Node(id=restamp(n["id"]), type=n["type"], properties=restamp_props(n["properties"]))
+            for n in data["nodes"]
+        ]
+        relationships = [
+            Relationship(
+                source=Node(id=restamp(r["source"]["id"]), type=r["source"]["type"]),
+                target=Node(id=restamp(r["target"]["id"]), type=r["target"]["type"]),
+                type=r["type"],
+                properties=restamp_props(r["properties"]),
+            )
+            for r in data["relationships"]
+        ]
+        return GraphDocument(
+            nodes=nodes,
+            relationships=relationships,
+            source=Document(page_content=text, metadata=metadata),
+        )
@@ -0,0 +1,201 @@
+import time
+import uuid
+import threading
+from collections import defaultdict
+
+
+def new_evidence_id():
+    return f"EV_{int(time.time())}_{str(uuid.uuid4())[:8]}"
+
+
+def _quote(identifier):
+    """라벨/관계 타입을 Cypher 식별자로 사용 (백틱 제거 후 감싸기)"""
+    return "`" + (str(identifier).replace("`", "") or "Node") + "`"
+
+
+class GraphWriter:
+    """
+    [DB 기록기]
+    추출된 GraphDocument와 원문 Evidence를 하나의 Cypher 문(= 1회 왕복, 1개 트랜잭션)으로 기록합니다.
+
+    - 노드는 (라벨, id) 쌍으로 MERGE하므로 라벨별 유니크 인덱스를 사용합니다.
+    - MENTIONED_IN 연결도 같은 (라벨, id)로 매칭하여, 다른 라벨의 동일 id 노드가 잘못 연결되지 않습니다.
+    - 여러 메시지를 묶어 보내도 각 메시지는 자신의 Evidence 노드에만 연결됩니다.
+    """
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._known_types = set()  # 이 프로세스에서 기록한 적 있는 라벨/관계 타입
+        self._listeners = []
+
+    def subscribe(self, callback):
+        """처음 보는 라벨/관계 타입이 기록되면 callback(new_types)을 호출하도록 등록합니다."""
+        self._listeners.append(callback)
+
+    def _notify_new_types(self, types):
+        new_types = types - self._known_types
+        if not new_types:
+            return
+        self._known_types |= new_types
+        for callback in self._listeners:
+            try:
+                callback(new_types)
+            except Exception as e:
+                print(f"  [Writer] 스키마 변경 알림 처리 실패: {e}")
+
+    def write(self, entries):
+        """
+        entries: [(source_type, text, graph_document), ...]
+        반환: 메시지별 연결된 노드 수 리스트
+        """
+        evidence = []
+        nodes = defaultdict(list)   # label -> rows
+        rels = defaultdict(list)    # (source_label, type, target_label) -> rows
+        linked = []
+
+        for source_type, text, graph_document in entries:
+            ev_id = new_evidence_id()
+            evidence.append({"id": ev_id, "text": text, "source": source_type})
+
+            seen = set()
+            for node in graph_document.nodes:
+                if (node.type, node.id) in seen:
+                    continue
+                seen.add((node.type, node.id))
+                nodes[node.type].append({"id": node.id, "properties": node.properties, "ev": ev_id})
+            linked.append(len(seen))
+
+            for rel in graph_document.relationships:
+                rels[(rel.source.type, rel.type, rel.target.type)].append({
+                    "source": rel.source.id, "target": rel.target.id, "properties": rel.properties
+                })
+
+        params = {"evidence": evidence}
+        parts = [
+            "UNWIND $evidence AS ev",
+            "MERGE (e:Evidence {id: ev.id})",
+            "SET e.text = ev.text, e.source = ev.source, e.timestamp = datetime()",
+            "WITH count(*) AS _",
+        ]
+
+        for i, (label, rows) in enumerate(nodes.items()):
+            params[f"nodes_{i}"] = rows
+            parts.append(f"""CALL () {{
+                UNWIND $nodes_{i} AS row
+                MERGE (n:{_quote(label)} {{id: row.id}})
+                SET n += row.properties
+                WITH n, row
+                MATCH (e:Evidence {{id: row.ev}})
+                MERGE (n)-[:MENTIONED_IN]->(e)
+            }}""")
+
+        for i, ((source_label, rel_type, target_label), rows) in enumerate(rels.items()):
+            params[f"rels_{i}"] = rows
+            parts.append(f"""CALL () {{
+                UNWIND $rels_{i} AS row
+                MERGE (s:{_quote(source_label)} {{id: row.source}})
+                MERGE (t:{_quote(target_label)} {{id: row.target}})
+                MERGE (s)-[r:{_quote(rel_type)}]->(t)
+                SET r += row.properties, r.updated_at = datetime()
+            }}""")
+
+        parts.append("RETURN count(*) AS ok")
+        self.graph.query("\n".join(parts), params=params)
+        self._notify_new_types({"Evidence", "MENTIONED_IN"} | set(nodes) | {key[1] for key in rels})
+        return linked
+
+
+class MetricBatchWriter:
+    """
+    [메트릭 기록기]
+    수치 메트릭 레코드({host, timestamp, cpu, mem, level})를 LLM 없이 Neo4j에 기록합니다.
+
+    - 레코드는 메모리에 모았다가 batch_size건이 차거나 flush_interval초가 지나면 한 번에 기록합니다.
+    - 기록 전 (host, bucket_seconds 구간) 단위로 미리 합산하여 구간당 Metric 노드 1개만 MERGE합니다.
+      (같은 구간이 여러 번에 나뉘어 들어와도 samples/합계/최대값이 누적되어 평균이 유지됩니다)
+    """
+
+    QUERY = """
+    UNWIND $rows AS row
+    MERGE (h:Host {id: row.host})
+    MERGE (m:Metric {id: row.id})
+    ON CREATE SET m.host = row.host, m.bucket_start = datetime({epochSeconds: row.bucket}),
+                  m.bucket_seconds = $bucket_seconds,
+                  m.samples = 0, m.cpu_sum = 0.0, m.mem_sum = 0.0, m.cpu_max = 0.0, m.mem_max = 0.0
+    SET m.samples = m.samples + row.samples,
+        m.cpu_sum = m.cpu_sum + row.cpu_sum,
+        m.mem_sum = m.mem_sum + row.mem_sum,
+        m.cpu_max = CASE WHEN row.cpu_max > m.cpu_max THEN row.cpu_max ELSE m.cpu_max END,
+        m.mem_max = CASE WHEN row.mem_max > m.mem_max THEN row.mem_max ELSE m.mem_max END,
+        m.critical = coalesce(m.critical, 0) + row.critical,
+        m.last_seen = datetime({epochMillis: row.last_ms})
+    SET m.cpu_avg = m.cpu_sum / m.samples, m.mem_avg = m.mem_sum / m.samples
+    MERGE (h)-[:REPORTED]->(m)
+    RETURN count(*) AS ok
+    """
+
+    def __init__(self, graph, bucket_seconds=60, batch_size=500, flush_interval=5.0):
+        self.graph = graph
+        self.bucket_seconds = bucket_seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="metric-writer")
+        self._thread.start()
+
+    def add(self, record):
+        with self._lock:
+            self._buffer.append(record)
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def _rollup(self, records):
+        buckets = {}
+        for r in records:
+            bucket = int(r["timestamp"] // self.bucket_seconds * self.bucket_seconds)
+            row = buckets.get((r["host"], bucket))
+            if row is None:
+                row = buckets[(r["host"], bucket)] = {
+                    "id": f"{r['host']}|{bucket}", "host": r["host"], "bucket": bucket, "samples": 0,
+                    "cpu_sum": 0.0, "mem_sum": 0.0, "cpu_max": 0.0, "mem_max": 0.0, "critical": 0, "last_ms": 0,
+                }
+            row["samples"] += 1
+            row["cpu_sum"] += r["cpu"]
+            row["mem_sum"] += r["mem"]
+            row["cpu_max"] = max(row["cpu_max"], r["cpu"])
+            row["mem_max"] = max(row["mem_max"], r["mem"])
+            row["critical"] += int(r.get("level") == "CRITICAL")
+            row["last_ms"] = max(row["last_ms"], int(r["timestamp"] * 1000))
+        return list(buckets.values())
+
+    def flush(self):
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return 0
+        try:
+            self.graph.query(self.QUERY, params={"rows": self._rollup(records), "bucket_seconds": self.bucket_seconds})
+            self.written += len(records)
+            return len(records)
+        except Exception as e:
+            print(f"  [Metric] 기록 실패 ({len(records)}건 다음 주기에 재시도): {e}")
+            with self._lock:
+                self._buffer[:0] = records
+            return 0
+
+    def _run(self):
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        self._closed.set()
+        self._wake.set()
+        self._thread.join(timeout=self.flush_interval)
+        self.flush()
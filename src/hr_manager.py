@@ -1,120 +1,386 @@
 import csv
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from itertools import islice
+
+# 1. 인물(Person) 및 조직(Organization) 노드 직접 생성 쿼리
+# UNWIND를 사용하여 대량 데이터를 한 번에 처리 (Batch Processing)
+QUERY_INGEST = """
+UNWIND $rows AS row
+
+// 1. Person 노드 생성 (속성 완벽 보존)
+MERGE (p:Person {id: row.id})
+
+// 0. 기존 HR 관계 정리: 팀/전공/자격증이 바뀌었을 때 이전 연결이 남지 않도록 다시 연결
+//    (속성이 바뀐 인물은 그로부터 추론된 CO_WORKER / ALUMNI 관계도 제거 -> 추론 재실행 시 재생성)
+WITH p, row
+OPTIONAL MATCH (p)-[old:WORKS_FOR|STUDIED|HAS_CERT]->()
+DELETE old
+WITH DISTINCT p, row
+OPTIONAL MATCH (p)-[inferred:CO_WORKER|ALUMNI]-()
+WHERE row.changed
+DELETE inferred
+WITH DISTINCT p, row
+
+SET p.name = row.name,
+    p.age = toInteger(row.age),
+    p.gender = row.gender,
+    p.role = row.role,
+    p.team = row.team,
+    p.company = row.company,
+    p.major = row.major,
+    p.row_hash = row.row_hash
+REMOVE p.hr_status
+
+// 2. Organization(Team) 노드 및 관계 연결
+MERGE (t:Organization {id: row.team})
+SET t.type = 'Team'
+MERGE (p)-[:WORKS_FOR]->(t)
+
+// 3. Organization(Company) 노드 및 관계 연결
+MERGE (c:Organization {id: row.company})
+SET c.type = 'Company'
+MERGE (t)-[:PART_OF]->(c)
+
+// 4. Major(전공) 노드 연결
+MERGE (m:Major {id: row.major})
+MERGE (p)-[:STUDIED]->(m)
+
+// 5. Certificate(자격증) 노드 연결 (직원별 개별 쿼리 없이 같은 패스에서 처리)
+FOREACH (cert_name IN row.certs |
+    MERGE (cert:Certificate {id: cert_name})
+    MERGE (p)-[:HAS_CERT]->(cert)
+)
+"""
+
+# HR 목록에서 사라진 인물: 조사 이력(Evidence, INTERACTED 등)은 보존하고 HR 관계만 해제
+QUERY_REMOVE = """
+UNWIND $ids AS pid
+MATCH (p:Person {id: pid})
+OPTIONAL MATCH (p)-[old:WORKS_FOR|STUDIED|HAS_CERT|CO_WORKER|ALUMNI]-()
+DELETE old
+WITH DISTINCT p
+SET p.hr_status = 'REMOVED'
+REMOVE p.row_hash
+"""
+
+# 행 지문(fingerprint)에 포함되는 HR 컬럼
+HR_FIELDS = ("id", "name", "age", "gender", "role", "team", "company", "group", "major", "certifications")
+
+_END = object()
+
 
 class HRDataManager:
-    def __init__(self, queue, graph):
+    def __init__(self, queue, graph, batch_size=1000, prefetch=2,
+                 inference_mode="auto", group_threshold=200, inference_batch_size=10000):
         self.queue = queue
         self.graph = graph
+        self.batch_size = batch_size  # 트랜잭션 1개당 처리할 행 수
+        self.prefetch = prefetch      # DB 기록 중 미리 읽어둘 배치 수 (0이면 파싱/기록 순차 진행)
+
+        # 관계 추론 전략: 'materialize'(모든 쌍 생성) / 'virtual'(생성 안 함) / 'auto'(그룹 크기로 결정)
+        self.inference_mode = inference_mode
+        self.group_threshold = group_threshold            # auto 모드에서 이 인원을 넘는 그룹은 virtual 처리
+        self.inference_batch_size = inference_batch_size  # 쌍 생성 시 트랜잭션 1개당 MERGE 수
+
+    @staticmethod
+    def _split_certs(value):
+        """'CISSP, CISA' -> ['CISSP', 'CISA'] ('없음' / 빈 값은 빈 리스트)"""
+        if not value or value == "없음":
+            return []
+        return [c.strip() for c in value.split(',') if c.strip()]
+
+    def _iter_rows(self, filename):
+        """CSV를 한 행씩 지연 로드 (파일 전체를 메모리에 올리지 않음)"""
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line_no, row in enumerate(csv.DictReader(f)):
+                row['certs'] = self._split_certs(row.get('certifications'))
+                row['row_hash'] = self._fingerprint(row)
+                row['line_no'] = line_no
+                yield row
+
+    @staticmethod
+    def _fingerprint(row):
+        """HR 행 내용 해시 - 값이 하나라도 바뀌면 달라짐"""
+        raw = "\x1f".join(str(row.get(k) or "") for k in HR_FIELDS)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _fetch_fingerprints(self):
+        """DB에 적재된 HR 인물의 {id: row_hash}"""
+        result = self.graph.query(
+            "MATCH (p:Person) WHERE p.row_hash IS NOT NULL RETURN p.id AS id, p.row_hash AS row_hash"
+        )
+        return {r['id']: r['row_hash'] for r in result}
 
-    def load_csv(self, filename="dummy/hr_data.csv"):
+    @staticmethod
+    def _iter_chunks(rows, size):
+        while True:
+            chunk = list(islice(rows, size))
+            if not chunk:
+                return
+            yield chunk
+
+    def _prefetched(self, chunks):
+        """
+        별도 스레드에서 다음 배치를 미리 파싱해 두어, DB 기록과 CSV 파싱이 겹쳐서 진행되게 합니다.
+        대기열 크기(prefetch)만큼만 앞서가므로 메모리 사용량은 일정합니다.
+        """
+        if self.prefetch <= 0:
+            yield from chunks
+            return
+
+        buffer = queue.Queue(maxsize=self.prefetch)
+        stopped = threading.Event()  # 소비 측이 중단(오류)되면 생산 스레드도 종료
+
+        def offer(item):
+            while not stopped.is_set():
+                try:
+                    buffer.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for chunk in chunks:
+                    if not offer(chunk):
+                        return
+            except Exception as e:
+                offer(e)
+            offer(_END)
+
+        threading.Thread(target=produce, daemon=True).start()
+        try:
+            while True:
+                chunk = buffer.get()
+                if chunk is _END:
+                    return
+                if isinstance(chunk, Exception):
+                    raise chunk
+                yield chunk
+        finally:
+            stopped.set()
+
+    # ------------------------------------------------------------------
+    # 중단 후 재개용 체크포인트 ({filename}.progress)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _signature(filename):
+        stat = os.stat(filename)
+        return f"{stat.st_size}:{int(stat.st_mtime)}"
+
+    def _load_checkpoint(self, filename):
+        """같은 파일(크기/수정시각 동일)에 대한 체크포인트가 있으면 커밋된 행 수 반환"""
+        path = f"{filename}.progress"
+        if not os.path.exists(path):
+            return 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            if checkpoint.get("signature") == self._signature(filename):
+                return checkpoint.get("rows_committed", 0)
+        except Exception as e:
+            print(f"  체크포인트 로드 실패 (처음부터 진행): {e}")
+        return 0
+
+    def _save_checkpoint(self, filename, rows_committed):
+        path = f"{filename}.progress"
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({"signature": self._signature(filename), "rows_committed": rows_committed}, f)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def _clear_checkpoint(filename):
+        path = f"{filename}.progress"
+        if os.path.exists(path):
+            os.remove(path)
+
+    def load_csv(self, filename="dummy/hr_data.csv", batch_size=None, resume=True, incremental=True):
         """
         [Direct Injection]
         CSV 데이터를 읽어 LLM을 거치지 않고 직접 Neo4j에 노드와 속성을 주입합니다.
         이 방식은 속성 누락을 100% 방지합니다.
+
+        [Streaming] 파일을 한 행씩 읽어 batch_size 단위로 커밋하므로 대용량 파일도 메모리를 일정하게 사용합니다.
+        배치가 커밋될 때마다 체크포인트를 남기며, 중단 후 다시 실행하면 마지막 커밋 지점부터 이어서 적재합니다.
+
+        [Delta Sync] incremental=True면 행 지문(row_hash)을 DB 값과 비교하여
+        신규/변경 행만 기록하고, CSV에서 사라진 인물은 HR 관계를 해제합니다.
         """
+        batch_size = batch_size or self.batch_size
         print(f"  [HR] '{filename}' 데이터를 로드하여 DB에 직접 동기화합니다...")
         
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-                
-            if not rows:
+            existing = self._fetch_fingerprints() if incremental else {}
+            if incremental:
+                print(f" - DB에 적재된 HR 인물 {len(existing)}명과 비교하여 변경분만 동기화합니다.")
+
+            skipped = self._load_checkpoint(filename) if resume else 0
+            if skipped:
+                print(f" - 이전 적재 기록 발견: {skipped}행 이후부터 이어서 진행합니다.")
+
+            rows = self._iter_rows(filename)
+            seen = set()
+            counts = {"new": 0, "changed": 0, "unchanged": 0}
+            for row in islice(rows, skipped):  # 이미 커밋된 행 건너뛰기
+                seen.add(row['id'])
+
+            def delta(rows):
+                for row in rows:
+                    seen.add(row['id'])
+                    previous = existing.get(row['id'])
+                    if previous == row['row_hash']:
+                        counts["unchanged"] += 1
+                        continue
+                    row['changed'] = previous is not None
+                    counts["changed" if previous else "new"] += 1
+                    yield row
+
+            print(f" - 임직원 데이터를 스트리밍 처리 중... (배치 {batch_size}건)")
+
+            # 배치 단위로 커밋 (graph.query 1회 = 트랜잭션 1개)
+            started_at = time.monotonic()
+            done = 0
+            for chunk in self._prefetched(self._iter_chunks(delta(rows), batch_size)):
+                self.graph.query(QUERY_INGEST, params={'rows': chunk})
+                done += len(chunk)
+                self._save_checkpoint(filename, chunk[-1]['line_no'] + 1)
+
+                elapsed = time.monotonic() - started_at
+                print(f"   - 진행: {chunk[-1]['line_no'] + 1}행까지 커밋 | {done / max(elapsed, 1e-6):.0f} rows/s")
+
+            if not seen:
                 print("  CSV 파일이 비어있습니다.")
                 return
 
-            print(f" - 총 {len(rows)}명의 임직원 데이터를 처리 중...")
+            removed = [pid for pid in existing if pid not in seen]
+            for start in range(0, len(removed), batch_size):
+                self.graph.query(QUERY_REMOVE, params={'ids': removed[start:start + batch_size]})
 
-            # 1. 인물(Person) 및 조직(Organization) 노드 직접 생성 쿼리
-            # UNWIND를 사용하여 대량 데이터를 한 번에 처리 (Batch Processing)
-            query_ingest = """
-            UNWIND $rows AS row
-            
-            // 1. Person 노드 생성 (속성 완벽 보존)
-            MERGE (p:Person {id: row.id})
-            SET p.name = row.name,
-                p.age = toInteger(row.age),
-                p.gender = row.gender,
-                p.role = row.role,
-                p.team = row.team,
-                p.company = row.company,
-                p.major = row.major
-            
-            // 2. Organization(Team) 노드 및 관계 연결
-            MERGE (t:Organization {id: row.team})
-            SET t.type = 'Team'
-            MERGE (p)-[:WORKS_FOR]->(t)
-            
-            // 3. Organization(Company) 노드 및 관계 연결
-            MERGE (c:Organization {id: row.company})
-            SET c.type = 'Company'
-            MERGE (t)-[:PART_OF]->(c)
-            
-            // 4. Major(전공) 노드 연결
-            MERGE (m:Major {id: row.major})
-            MERGE (p)-[:STUDIED]->(m)
-            """
-            
-            # 자격증 처리는 리스트 형태라 별도 로직 필요, 혹은 위에서 처리 가능하지만
-            # 복잡도를 낮추기 위해 루프 내에서 개별 처리하지 않고, 여기서는 간단히 무시하거나
-            # 필요 시 아래와 같이 추가 쿼리 실행 가능.
-            
-            # 쿼리 실행
-            self.graph.query(query_ingest, params={'rows': rows})
-            
-            # 자격증(Certificate) 별도 처리 (쉼표로 구분된 경우)
-            for row in rows:
-                if row.get('certifications') and row['certifications'] != "없음":
-                    certs = [c.strip() for c in row['certifications'].split(',')]
-                    query_cert = """
-                    MATCH (p:Person {id: $pid})
-                    UNWIND $certs AS cert_name
-                    MERGE (c:Certificate {id: cert_name})
-                    MERGE (p)-[:HAS_CERT]->(c)
-                    """
-                    self.graph.query(query_cert, params={'pid': row['id'], 'certs': certs})
-
-            print(f" {len(rows)}명의 데이터가 그래프 DB에 완벽하게 적재되었습니다.")
+            self._clear_checkpoint(filename)
+            elapsed = time.monotonic() - started_at
+            print(
+                f" 동기화 완료: 신규 {counts['new']} / 변경 {counts['changed']} / "
+                f"유지 {counts['unchanged']} / 제외 {len(removed)}명 ({elapsed:.2f}s)"
+            )
             
         except FileNotFoundError:
             print(f" 파일을 찾을 수 없습니다: {filename}")
         except Exception as e:
             print(f" 데이터 적재 중 오류 발생: {e}")
+            print(f" 다시 실행하면 마지막으로 커밋된 배치 이후부터 이어서 적재합니다.")
 
-    def run_relationship_inference(self):
-        """Phase 2: 그래프 내부를 분석하여 관계 연결 및 가중치 부여 (Inference)"""
-        print("  [HR] 인물 간 관계 및 가중치 추론(Inference)을 시작합니다...")
-        
-        # [규칙 1] 같은 팀(Organization) 소속이면 'CO_WORKER' 관계 형성
-        query_team = """
-        MATCH (p1:Person)-[:WORKS_FOR]->(t:Organization)<-[:WORKS_FOR]-(p2:Person)
-        WHERE elementId(p1) < elementId(p2) 
-        MERGE (p1)-[r:CO_WORKER]-(p2)
-        SET r.strength = 8, 
-            r.source = 'System_Inference_Team'
-        RETURN count(r) as connections
+    # 공통 소속 기반 관계 추론 규칙: (관계 타입, 소속 관계, 그룹 라벨, 강도, 출처, 설명)
+    INFERENCE_RULES = [
+        ("CO_WORKER", "WORKS_FOR", "Organization", 8, "System_Inference_Team", "같은 부서 동료"),
+        ("ALUMNI", "STUDIED", "Major", 3, "System_Inference_Major", "같은 전공 동문"),
+    ]
+
+    def _group_sizes(self, member_rel, group_label):
+        result = self.graph.query(f"""
+        MATCH (g:{group_label})<-[:{member_rel}]-(p:Person)
+        RETURN g.id AS id, count(p) AS size
+        """)
+        return {r['id']: r['size'] for r in result}
+
+    def _materialize(self, rel_type, member_rel, group_label, strength, source, group_ids):
         """
-        
-        # [규칙 2] 같은 전공(Major)이면 'ALUMNI' 관계 형성
-        query_major = """
-        MATCH (p1:Person)-[:STUDIED]->(m:Major)<-[:STUDIED]-(p2:Person)
+        그룹 내 모든 인물 쌍에 관계를 생성합니다.
+        그룹 단위로 매칭하고 CALL {} IN TRANSACTIONS로 나누어 커밋하므로
+        그래프 전체 조인 없이, 한 트랜잭션이 너무 커지지 않게 처리됩니다.
+        """
+        # 다시 작아진 그룹은 virtual 표시를 해제
+        self.graph.query(f"""
+        UNWIND $group_ids AS gid
+        MATCH (g:{group_label} {{id: gid}})
+        REMOVE g.virtual_relation, g.member_count
+        """, params={'group_ids': group_ids})
+
+        result = self.graph.query(f"""
+        UNWIND $group_ids AS gid
+        MATCH (g:{group_label} {{id: gid}})<-[:{member_rel}]-(p1:Person)
+        MATCH (g)<-[:{member_rel}]-(p2:Person)
         WHERE elementId(p1) < elementId(p2)
-        MERGE (p1)-[r:ALUMNI]-(p2)
-        SET r.strength = 3, 
-            r.source = 'System_Inference_Major'
-        RETURN count(r) as connections
+        CALL (p1, p2) {{
+            MERGE (p1)-[r:{rel_type}]-(p2)
+            SET r.strength = $strength,
+                r.source = $source
+        }} IN TRANSACTIONS OF $batch ROWS
+        RETURN count(*) AS connections
+        """, params={
+            'group_ids': group_ids, 'strength': strength,
+            'source': source, 'batch': self.inference_batch_size
+        })
+        return result[0]['connections'] if result else 0
+
+    def _mark_virtual(self, rel_type, member_rel, group_label, source, sizes):
         """
-        
+        관계를 쌍으로 만들지 않고 그룹 노드에 표시만 합니다.
+        질의 시에는 (p1)-[:소속]->(g)<-[:소속]-(p2) 패턴으로 동일한 답을 얻을 수 있습니다. (ontology.py 질의 지침)
+        이전에 작은 그룹이라 만들어 둔 추론 관계는 삭제하여, 같은 그룹이 쌍 관계와 virtual 표시를 동시에 갖지 않게 합니다.
+        (다른 작은 그룹을 함께 공유하는 쌍의 관계는 유지)
+        """
+        self.graph.query(f"""
+        UNWIND $groups AS grp
+        MATCH (g:{group_label} {{id: grp.id}})
+        SET g.virtual_relation = $rel_type,
+            g.member_count = grp.size
+        """, params={'groups': [{'id': k, 'size': v} for k, v in sizes.items()], 'rel_type': rel_type})
+
+        result = self.graph.query(f"""
+        UNWIND $group_ids AS gid
+        MATCH (g:{group_label} {{id: gid}})<-[:{member_rel}]-(p1:Person)-[r:{rel_type} {{source: $source}}]-(p2:Person)
+        WHERE elementId(p1) < elementId(p2) AND (p2)-[:{member_rel}]->(g)
+          AND NOT EXISTS {{
+            MATCH (p1)-[:{member_rel}]->(other:{group_label})<-[:{member_rel}]-(p2)
+            WHERE other.virtual_relation IS NULL
+          }}
+        CALL (r) {{
+            DELETE r
+        }} IN TRANSACTIONS OF $batch ROWS
+        RETURN count(*) AS removed
+        """, params={'group_ids': list(sizes), 'source': source, 'batch': self.inference_batch_size})
+        return result[0]['removed'] if result else 0
+
+    def run_relationship_inference(self, mode=None):
+        """
+        Phase 2: 그래프 내부를 분석하여 관계 연결 및 가중치 부여 (Inference)
+        그룹 크기를 먼저 집계한 뒤, 작은 그룹은 쌍 관계를 배치 생성하고
+        큰 그룹(auto 모드에서 group_threshold 초과)은 O(n^2) 생성 대신 virtual로 표시합니다.
+        """
+        mode = mode or self.inference_mode
+        print(f"  [HR] 인물 간 관계 및 가중치 추론(Inference)을 시작합니다... (모드: {mode})")
+
         try:
-            # 팀 동료 추론
-            res1 = self.graph.query(query_team)
-            c1 = res1[0]['connections'] if res1 else 0
-            
-            # 전공 동문 추론
-            res2 = self.graph.query(query_major)
-            c2 = res2[0]['connections'] if res2 else 0
-            
-            print(f"  [결과] 같은 부서 동료 관계: {c1}건 연결됨.")
-            print(f"  [결과] 같은 전공 동문 관계: {c2}건 연결됨.")
+            for rel_type, member_rel, group_label, strength, source, label in self.INFERENCE_RULES:
+                started_at = time.monotonic()
+                sizes = self._group_sizes(member_rel, group_label)
+
+                if mode == "materialize":
+                    small, large = sizes, {}
+                elif mode == "virtual":
+                    small, large = {}, sizes
+                else:
+                    small = {k: v for k, v in sizes.items() if v <= self.group_threshold}
+                    large = {k: v for k, v in sizes.items() if v > self.group_threshold}
+
+                connections = removed = 0
+                if small:
+                    connections = self._materialize(rel_type, member_rel, group_label, strength, source, list(small))
+                if large:
+                    removed = self._mark_virtual(rel_type, member_rel, group_label, source, large)
+
+                elapsed = time.monotonic() - started_at
+                print(f"  [결과] {label} 관계: {connections}건 연결됨. ({len(small)}개 그룹, {elapsed:.2f}s)")
+                if large:
+                    print(f"  [결과] {label}: 대형 그룹 {len(large)}개(최대 {max(large.values())}명)는 "
+                          f"관계 생성 없이 공통 {group_label} 노드로 조회합니다. (기존 쌍 관계 {removed}건 삭제)")
             
         except Exception as e:
-            print(f"  추론 쿼리 실행 실패: {e}")
\ No newline at end of file
+            print(f"  추론 쿼리 실행 실패: {e}")
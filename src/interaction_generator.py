@@ -0,0 +1,355 @@
+import csv
+import os
+import time
+import uuid
+import random
+from datetime import datetime
+
+from data_generator import ACTIONS, ChunkWriter, np
+from template_extractor import INTERACTION_SCORES, DEFAULT_INTERACTION_SCORE
+
+# neo4j-admin import 헤더 (IdSpace를 라벨별로 분리하여 서로 다른 라벨의 같은 id가 충돌하지 않게 함)
+PERSON_HEADER = ["id:ID(Person)", "name", "team", "role", "group", ":LABEL"]
+# time: 상호작용 발생 시각 / updated_at: 기록 시각 (증분 관계 집계의 워터마크 기준, GraphWriter와 동일한 의미)
+INTERACTED_HEADER = [":START_ID(Person)", ":END_ID(Person)", "score:int", "action", "time:datetime", "updated_at:datetime", ":TYPE"]
+EVENT_HEADER = ["id:ID(Event)", "action", "location", "time", "source", "category", ":LABEL"]
+EVIDENCE_HEADER = ["id:ID(Evidence)", "text", "source", "timestamp:datetime", ":LABEL"]
+PERFORMED_HEADER = [":START_ID(Person)", ":END_ID(Event)", ":TYPE"]
+MENTIONED_HEADER = [":START_ID(Event)", ":END_ID(Evidence)", ":TYPE"]
+# GraphWriter는 추출된 모든 노드(Person 포함)를 Evidence에 연결하므로 같은 모양을 만듦 (IdSpace가 달라 파일 분리)
+PERSON_MENTIONED_HEADER = [":START_ID(Person)", ":END_ID(Evidence)", ":TYPE"]
+# with_evidence=True일 때만 생성되는 파일 (줄 순서가 interacted.csv와 일치)
+EVIDENCE_FILES = ("events.csv", "evidence.csv", "performed.csv", "mentioned_in.csv", "person_mentioned_in.csv")
+
+QUERY_INTERACTED = """
+UNWIND $rows AS row
+MATCH (a:Person {id: row.source})
+MATCH (b:Person {id: row.target})
+CREATE (a)-[:INTERACTED {score: row.score, action: row.action, time: datetime(row.occurred_at), updated_at: datetime()}]->(b)
+"""
+# 실제로 만들어진 관계 수 (Person이 없어 MATCH가 실패한 행은 세지 않음)
+RETURN_CREATED = "RETURN count(*) AS created"
+
+# 근거까지 적재할 때는 INTERACTED와 Event / Evidence를 한 문장(= 한 트랜잭션)으로 만들어 배치가 반만 반영되지 않게 함
+QUERY_EVENTS = QUERY_INTERACTED + """CREATE (e:Event {id: row.event, action: row.action, location: row.location, time: row.time,
+                 source: row.report_source, category: 'RELATION'})
+CREATE (ev:Evidence {id: row.evidence, text: row.text, source: 'AUTO_GEN', timestamp: datetime(row.occurred_at)})
+CREATE (a)-[:PERFORMED]->(e), (b)-[:PERFORMED]->(e)
+CREATE (a)-[:MENTIONED_IN]->(ev), (b)-[:MENTIONED_IN]->(ev), (e)-[:MENTIONED_IN]->(ev)
+""" + RETURN_CREATED
+
+
+def interaction_score(action):
+    """TemplateExtractor와 같은 규칙으로 행동 설명의 괄호 태그를 점수로 변환"""
+    for tag, score in INTERACTION_SCORES.items():
+        if tag in action:
+            return score
+    return DEFAULT_INTERACTION_SCORE
+
+
+class InteractionHistoryGenerator:
+    """
+    [합성 상호작용 이력]
+    hr_data.csv의 직원 목록을 바탕으로 LLM 없이 대량의 INTERACTED 이력을 만듭니다.
+
+    - 활동량: 직원마다 파레토 분포 가중치를 부여 (소수의 '허브' 인물이 대부분의 상호작용에 등장)
+    - 상대 선택: team_bias 확률로 같은 팀에서, 나머지는 전체에서 활동량 가중 추출 (본인 제외)
+    - 시각: end 이전 months개월에 고르게 분포
+    - 행동/점수: 시뮬레이터의 RELATION 시나리오와 TemplateExtractor 점수 규칙을 그대로 사용
+
+    출력은 neo4j-admin database import full 용 CSV(헤더 포함)이며, 운영 DB에는 load()로 배치 UNWIND 적재합니다.
+    각 상호작용은 개별 INTERACTED 관계(이력)로 기록되며, 관계 집계 엔진이 쌍 단위로 합산합니다.
+    발생 시각은 r.time에, 기록 시각은 r.updated_at(= 적재 시점)에 두어 증분 집계 워터마크와 충돌하지 않습니다.
+    """
+
+    def __init__(self, out_dir="dummy/interactions", alpha=1.5, team_bias=0.7, months=6, seed=None):
+        self.out_dir = out_dir
+        self.alpha = alpha
+        self.team_bias = team_bias
+        self.months = months
+        self.seed = seed
+        self.scenes = [a for a in ACTIONS if a["category"] == "RELATION"]
+
+    # -------------------------------------------------
+    # 입력
+    # -------------------------------------------------
+    @staticmethod
+    def load_people(hr_file):
+        with open(hr_file, 'r', encoding='utf-8') as f:
+            return [
+                {"id": row["id"].strip().lower(), "name": row.get("name", ""), "team": row.get("team", ""),
+                 "role": row.get("role", ""), "group": row.get("group", ""),
+                 "age": row.get("age", "30"), "gender": row.get("gender", "알수없음")}
+                for row in csv.DictReader(f)
+            ]
+
+    # -------------------------------------------------
+    # 샘플링
+    # -------------------------------------------------
+    def _prepare(self, people, rng):
+        """활동량 가중치와 팀별 (구성원, 누적 가중치) 표를 만듦"""
+        n = len(people)
+        teams = {}
+        for i, person in enumerate(people):
+            teams.setdefault(person["team"], []).append(i)
+        team_codes = {team: code for code, team in enumerate(teams)}
+        member_team = [team_codes[p["team"]] for p in people]
+
+        if np is not None:
+            weights = rng.pareto(self.alpha, size=n) + 1.0
+            cum = np.cumsum(weights)
+            team_tables = []
+            for members in teams.values():
+                members = np.asarray(members)
+                team_tables.append((members, np.cumsum(weights[members])))
+            return {"cum": cum, "member_team": np.asarray(member_team), "teams": team_tables}
+
+        weights = [rng.paretovariate(self.alpha) for _ in range(n)]
+        team_tables = []
+        for members in teams.values():
+            total, cum = 0.0, []
+            for i in members:
+                total += weights[i]
+                cum.append(total)
+            team_tables.append((members, cum))
+        total, cum = 0.0, []
+        for w in weights:
+            total += w
+            cum.append(total)
+        return {"cum": cum, "member_team": member_team, "teams": team_tables}
+
+    def _pairs(self, n, rng, table):
+        """(actor, partner) 인덱스 n쌍. 활동량 가중, 팀 편향, 본인 제외"""
+        cum, member_team, teams = table["cum"], table["member_team"], table["teams"]
+        size = len(cum)
+
+        if np is None:
+            population = range(size)
+            actors = rng.choices(population, cum_weights=cum, k=n)
+            partners = []
+            for a in actors:
+                members, team_cum = teams[member_team[a]]
+                b = a
+                for _ in range(8):
+                    if len(members) > 1 and rng.random() < self.team_bias:
+                        b = rng.choices(members, cum_weights=team_cum)[0]
+                    else:
+                        b = rng.choices(population, cum_weights=cum)[0]
+                    if b != a:
+                        break
+                partners.append(b if b != a else (a + 1) % size)
+            return actors, partners
+
+        actors = np.searchsorted(cum, rng.random(n) * cum[-1], side="right")
+        partners = np.searchsorted(cum, rng.random(n) * cum[-1], side="right")
+        in_team = rng.random(n) < self.team_bias
+        actor_teams = member_team[actors]
+        for code, (members, team_cum) in enumerate(teams):
+            if len(members) < 2:
+                continue
+            mask = in_team & (actor_teams == code)
+            k = int(mask.sum())
+            if k:
+                partners[mask] = members[np.searchsorted(team_cum, rng.random(k) * team_cum[-1], side="right")]
+
+        # 본인이 뽑힌 경우만 다시 추출 (몇 번 안에 거의 사라지며, 남으면 옆 사람으로)
+        for _ in range(8):
+            same = partners == actors
+            if not same.any():
+                break
+            partners[same] = np.searchsorted(cum, rng.random(int(same.sum())) * cum[-1], side="right")
+        partners = np.where(partners == actors, (actors + 1) % size, partners)
+        return actors.tolist(), partners.tolist()
+
+    def _chunk(self, n, rng, people, table, offset, window):
+        end, span = window
+        actors, partners = self._pairs(n, rng, table)
+        if np is not None:
+            scenes = rng.integers(0, len(self.scenes), size=n).tolist()
+            seconds = (end - rng.integers(0, span, size=n)).tolist()
+        else:
+            scenes = [rng.randrange(len(self.scenes)) for _ in range(n)]
+            seconds = [end - rng.randrange(span) for _ in range(n)]
+
+        rows = []
+        for k, (a, b, s, t) in enumerate(zip(actors, partners, scenes, seconds)):
+            scene = self.scenes[s]
+            moment = datetime.fromtimestamp(t)
+            rows.append({
+                "seq": offset + k,
+                "source": people[a]["id"], "target": people[b]["id"],
+                "score": interaction_score(scene["action"]), "action": scene["action"],
+                "occurred_at": moment.isoformat(timespec="seconds"),
+                "time": moment.strftime("%Y-%m-%d %H:%M:%S"),
+                "location": scene["location"], "report_source": scene["source"],
+            })
+        return rows
+
+    def _report_text(self, row, people_by_id):
+        """시뮬레이터 제보와 같은 형식의 원문 (Evidence.text)"""
+        def profile(pid):
+            p = people_by_id[pid]
+            return f"{p['team']} {p['name']} {p['role']} (ID: {pid}, {p['age']}세/{p['gender']})"
+        return (
+            f"[{row['time']}] [제보-RELATION/{row['report_source']}] 장소: '{row['location']}'에서 식별된 인물 "
+            f"'{profile(row['source'])}'이(가) 대상 '{profile(row['target'])}'와(과) 함께 다음 행동을 수행함: {row['action']}."
+        )
+
+    # -------------------------------------------------
+    # 생성 (neo4j-admin import CSV)
+    # -------------------------------------------------
+    def generate(self, hr_file, count, chunk_size=200_000, with_evidence=False, end=None):
+        """
+        상호작용 count건을 out_dir에 CSV로 기록하고 neo4j-admin import 명령을 출력합니다.
+        with_evidence=True면 상호작용마다 Event / Evidence 노드와 PERFORMED / MENTIONED_IN(Person, Event -> Evidence) 관계도 함께 만듭니다.
+        발생 시각은 end(기본: 오늘 0시) 이전 months개월에 분포하므로, seed로 재현하려면 end도 지정해야 합니다.
+        """
+        people = self.load_people(hr_file)
+        if len(people) < 2:
+            print("  [Interaction] 직원이 2명 이상 필요합니다.")
+            return None
+        people_by_id = {p["id"]: p for p in people}
+
+        rng = np.random.default_rng(self.seed) if np is not None else random.Random(self.seed)
+        table = self._prepare(people, rng)
+        if end is None:
+            end = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+            if self.seed is not None:
+                print(f"  [Interaction] end 미지정: 발생 시각이 실행 날짜({end:%Y-%m-%d}) 기준입니다. (재현하려면 end 지정)")
+        window = (int(end.timestamp()), self.months * 30 * 86400)
+
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = lambda name: os.path.join(self.out_dir, name)
+        print(f"🏭 [Interaction] 직원 {len(people)}명 / 상호작용 {count}건 생성 "
+              f"(alpha={self.alpha}, team_bias={self.team_bias}, {self.months}개월, seed={self.seed})")
+
+        with open(path("people.csv"), "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(PERSON_HEADER)
+            writer.writerows([p["id"], p["name"], p["team"], p["role"], p["group"], "Person"] for p in people)
+
+        files = {"interacted": ChunkWriter(path("interacted.csv"), INTERACTED_HEADER)}
+        if not with_evidence:
+            # 이전 실행의 근거 파일이 남아 있으면 load()가 이번 상호작용과 잘못 짝지으므로 제거
+            for name in EVIDENCE_FILES:
+                if os.path.exists(path(name)):
+                    os.remove(path(name))
+        else:
+            files["events"] = ChunkWriter(path("events.csv"), EVENT_HEADER)
+            files["evidence"] = ChunkWriter(path("evidence.csv"), EVIDENCE_HEADER)
+            files["performed"] = ChunkWriter(path("performed.csv"), PERFORMED_HEADER)
+            files["mentioned_in"] = ChunkWriter(path("mentioned_in.csv"), MENTIONED_HEADER)
+            files["person_mentioned_in"] = ChunkWriter(path("person_mentioned_in.csv"), PERSON_MENTIONED_HEADER)
+
+        # Event.id / Evidence.id는 유니크 제약 대상이므로 실행마다 다른 접두어를 붙여 여러 번 생성/적재해도 충돌하지 않게 함
+        run_id = uuid.uuid4().hex[:8]
+        # neo4j-admin import는 datetime()을 쓸 수 없으므로 생성 시각을 기록 시각으로 사용
+        written_at = datetime.now().astimezone().isoformat(timespec="seconds")
+        started = time.monotonic()
+        try:
+            for offset in range(0, count, chunk_size):
+                rows = self._chunk(min(chunk_size, count - offset), rng, people, table, offset, window)
+                files["interacted"].write(dict(zip(INTERACTED_HEADER, zip(*[
+                    (r["source"], r["target"], r["score"], r["action"], r["occurred_at"], written_at, "INTERACTED")
+                    for r in rows
+                ]))))
+                if with_evidence:
+                    self._write_evidence(files, rows, people_by_id, run_id)
+                done = files["interacted"].rows
+                print(f"   - 상호작용 {done}/{count} ({done / max(time.monotonic() - started, 1e-6):,.0f}건/s)")
+        finally:
+            for writer in files.values():
+                writer.close()
+
+        command = self.import_command(with_evidence)
+        print(f" [Interaction] 생성 완료. 빈 DB에 적재하려면:\n   {command}")
+        return command
+
+    def _write_evidence(self, files, rows, people_by_id, run_id):
+        events, evidence, performed, mentioned, person_mentioned = [], [], [], [], []
+        for r in rows:
+            event_id, evidence_id = f"evt-syn-{run_id}-{r['seq']}", f"EV_SYN_{run_id}_{r['seq']}"
+            events.append((event_id, r["action"], r["location"], r["time"], r["report_source"], "RELATION", "Event"))
+            evidence.append((evidence_id, self._report_text(r, people_by_id), "AUTO_GEN", r["occurred_at"], "Evidence"))
+            performed.append((r["source"], event_id, "PERFORMED"))
+            performed.append((r["target"], event_id, "PERFORMED"))
+            mentioned.append((event_id, evidence_id, "MENTIONED_IN"))
+            person_mentioned.append((r["source"], evidence_id, "MENTIONED_IN"))
+            person_mentioned.append((r["target"], evidence_id, "MENTIONED_IN"))
+        files["events"].write(dict(zip(EVENT_HEADER, zip(*events))))
+        files["evidence"].write(dict(zip(EVIDENCE_HEADER, zip(*evidence))))
+        files["performed"].write(dict(zip(PERFORMED_HEADER, zip(*performed))))
+        files["mentioned_in"].write(dict(zip(MENTIONED_HEADER, zip(*mentioned))))
+        files["person_mentioned_in"].write(dict(zip(PERSON_MENTIONED_HEADER, zip(*person_mentioned))))
+
+    def import_command(self, with_evidence=False, database="neo4j"):
+        path = lambda name: os.path.join(self.out_dir, name)
+        parts = [
+            "neo4j-admin database import full",
+            f"--nodes={path('people.csv')}",
+            f"--relationships={path('interacted.csv')}",
+        ]
+        if with_evidence:
+            parts += [
+                f"--nodes={path('events.csv')}",
+                f"--nodes={path('evidence.csv')}",
+                f"--relationships={path('performed.csv')}",
+                f"--relationships={path('mentioned_in.csv')}",
+                f"--relationships={path('person_mentioned_in.csv')}",
+            ]
+        return " ".join(parts + ["--multiline-fields=true", database])
+
+    # -------------------------------------------------
+    # 운영 DB 적재 (배치 UNWIND)
+    # -------------------------------------------------
+    def load(self, graph, batch_size=10_000):
+        """
+        생성된 CSV를 batch_size건씩 UNWIND로 적재합니다. (Person은 HR 적재로 이미 있어야 함)
+        events.csv가 있으면 Event / Evidence도 함께 적재합니다. (generate가 근거 없이 실행되면 이전 근거 파일은 지워짐)
+        반환값은 실제로 만들어진 INTERACTED 수입니다. (Person이 없는 행은 MATCH에서 빠짐)
+        """
+        interacted = os.path.join(self.out_dir, "interacted.csv")
+        evidence_file = os.path.join(self.out_dir, "evidence.csv")
+        events_file = os.path.join(self.out_dir, "events.csv")
+        with_evidence = os.path.exists(evidence_file) and os.path.exists(events_file)
+
+        started = time.monotonic()
+        loaded = created = 0
+        with open(interacted, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader)
+            ev_reader = ev_file = events_reader = ev_events = None
+            if with_evidence:
+                ev_file = open(evidence_file, 'r', encoding='utf-8')
+                ev_events = open(events_file, 'r', encoding='utf-8')
+                ev_reader, events_reader = csv.reader(ev_file), csv.reader(ev_events)
+                next(ev_reader)
+                next(events_reader)
+            try:
+                while True:
+                    batch = [row for _, row in zip(range(batch_size), reader)]
+                    if not batch:
+                        break
+                    rows = [
+                        {"source": s, "target": t, "score": int(score), "action": action, "occurred_at": at}
+                        for s, t, score, action, at, _, _ in batch
+                    ]
+                    if with_evidence:
+                        # 같은 순서로 기록되었으므로 줄 단위로 짝이 맞음
+                        for row, ev, event in zip(rows, ev_reader, events_reader):
+                            row.update(event=event[0], location=event[2], time=event[3],
+                                       report_source=event[4], evidence=ev[0], text=ev[1])
+                    query = QUERY_EVENTS if with_evidence else QUERY_INTERACTED + RETURN_CREATED
+                    result = graph.query(query, params={"rows": rows})
+                    created += result[0]["created"] if result else 0
+                    loaded += len(rows)
+                    print(f"   - 전송 {loaded}건 / 생성 {created}건 ({loaded / max(time.monotonic() - started, 1e-6):,.0f}건/s)")
+            finally:
+                if ev_file:
+                    ev_file.close()
+                    ev_events.close()
+
+        print(f" [Interaction] INTERACTED {created}건 적재 완료")
+        if created < loaded:
+            print(f"  [Interaction] {loaded - created}건은 Person이 없어 건너뜀 (HR 데이터 로드[5] 필요)")
+        return created
@@ -1,5 +1,12 @@
 import os
+import time
+import random
+import asyncio
+import threading
 from dotenv import load_dotenv
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.rate_limiters import InMemoryRateLimiter
+from pydantic import PrivateAttr
 
 try:
     from langchain_openai import ChatOpenAI
@@ -16,12 +23,214 @@ try:
 except ImportError:
     ChatOllama = None
 
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
 load_dotenv()
 
+# 제공자별 기본 요청 한도 (초당 요청 수, 순간 최대 버스트). LLM_RPS / LLM_BURST로 덮어쓸 수 있습니다.
+PROVIDER_LIMITS = {
+    "openai": (8.0, 16),
+    "google": (4.0, 8),
+    "ollama": (50.0, 50),  # 로컬 서버: 사실상 제한 없음
+}
+
+# 재시도 대상 오류 (제공자 SDK를 import하지 않고 클래스 이름/상태 코드로 판별)
+TRANSIENT_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = {
+    "RateLimitError", "APITimeoutError", "APIConnectionError", "InternalServerError",
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "TooManyRequests",
+    "TimeoutException", "ConnectError", "ReadError", "RemoteProtocolError", "ConnectionError", "Timeout",
+}
+
+
+def is_transient(error):
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if status in TRANSIENT_STATUS:
+        return True
+    return any(cls.__name__ in TRANSIENT_ERRORS for cls in type(error).__mro__)
+
+
+def _retry_after(error):
+    """서버가 Retry-After 헤더로 대기 시간을 알려주면 그 값을 사용"""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class ResilientChatModel(BaseChatModel):
+    """
+    [LLM 호출 보호 계층]
+    실제 ChatModel(inner)을 감싸 모든 호출에
+      - 토큰 버킷 요청 제한 (rate_limiter, BaseChatModel이 호출 직전에 대기)
+      - 일시적 오류(429/5xx/타임아웃)에 대한 지수 백오프 + 지터 재시도
+      - 호출별 지연 시간 / 토큰 사용량 집계
+    를 적용합니다. LangChain ChatModel 인터페이스를 그대로 유지하므로
+    LLMGraphTransformer(with_structured_output)와 QA 체인(stream)이 수정 없이 사용합니다.
+    스트리밍은 첫 청크를 받기 전까지만 재시도합니다. (중간에 끊기면 중복 출력되므로)
+    """
+
+    inner: BaseChatModel
+    max_attempts: int = 5
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    # model_post_init은 langchain-core가 사용하므로 재정의하지 않고 PrivateAttr로 초기화
+    _lock: threading.Lock = PrivateAttr(default_factory=threading.Lock)
+    _stats: dict = PrivateAttr(default_factory=lambda: {
+        "calls": 0, "errors": 0, "retries": 0, "latency_ms": 0.0, "input_tokens": 0, "output_tokens": 0,
+    })
+
+    @property
+    def _llm_type(self):
+        # LLMGraphTransformer가 제공자별 스키마를 고를 때 사용하므로 실제 모델 값을 그대로 노출
+        return self.inner._llm_type
+
+    @property
+    def _identifying_params(self):
+        return {"inner": self.inner._llm_type, **self.inner._identifying_params}
+
+    # -------------------------------------------------
+    # 재시도 / 집계
+    # -------------------------------------------------
+    def _backoff(self, attempt, error):
+        delay = _retry_after(error)
+        if delay is None:
+            delay = min(self.max_delay, self.base_delay * 2 ** attempt)
+            delay = random.uniform(delay / 2, delay)  # 여러 워커가 동시에 재시도하지 않도록 지터
+        with self._lock:
+            self._stats["retries"] += 1
+        print(f"  [LLM] 일시적 오류로 {delay:.1f}초 후 재시도 ({attempt + 1}/{self.max_attempts - 1}): {type(error).__name__}")
+        return delay
+
+    def _should_retry(self, attempt, error):
+        return attempt < self.max_attempts - 1 and is_transient(error)
+
+    def _record(self, started, result=None, error=False, usage=None):
+        usage = usage or {}
+        if result is not None and result.generations:
+            usage = getattr(result.generations[0].message, "usage_metadata", None) or {}
+        with self._lock:
+            self._stats["calls"] += 1
+            self._stats["errors"] += int(error)
+            self._stats["latency_ms"] += (time.monotonic() - started) * 1000
+            self._stats["input_tokens"] += usage.get("input_tokens", 0)
+            self._stats["output_tokens"] += usage.get("output_tokens", 0)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["avg_latency_ms"] = stats["latency_ms"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
+
+    # -------------------------------------------------
+    # BaseChatModel 구현 (inner로 위임)
+    # -------------------------------------------------
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        for attempt in range(self.max_attempts):
+            started = time.monotonic()
+            try:
+                result = self.inner._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                self._record(started, error=True)
+                if not self._should_retry(attempt, e):
+                    raise
+                time.sleep(self._backoff(attempt, e))
+                continue
+            self._record(started, result)
+            return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        for attempt in range(self.max_attempts):
+            started = time.monotonic()
+            try:
+                result = await self.inner._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except Exception as e:
+                self._record(started, error=True)
+                if not self._should_retry(attempt, e):
+                    raise
+                await asyncio.sleep(self._backoff(attempt, e))
+                continue
+            self._record(started, result)
+            return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for attempt in range(self.max_attempts):
+            started = time.monotonic()
+            first = True
+            usage = {}
+            try:
+                for chunk in self.inner._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                    first = False
+                    # 사용량은 보통 마지막 청크에만 오지만, 나눠 오는 제공자도 있어 청크 병합과 같이 합산
+                    for key, value in (getattr(chunk.message, "usage_metadata", None) or {}).items():
+                        if isinstance(value, int):
+                            usage[key] = usage.get(key, 0) + value
+                    yield chunk
+            except Exception as e:
+                self._record(started, error=True)
+                if not first or not self._should_retry(attempt, e):
+                    raise
+                time.sleep(self._backoff(attempt, e))
+                continue
+            self._record(started, usage=usage)
+            return
+
+    def bind_tools(self, tools, **kwargs):
+        # 도구 스키마 변환은 제공자 모델에 맡기고, 만들어진 호출 인자만 이 래퍼에 바인딩
+        return self.bind(**self.inner.bind_tools(tools, **kwargs).kwargs)
+
+
+def _rate_limiter(provider):
+    rps, burst = PROVIDER_LIMITS.get(provider, (4.0, 8))
+    return InMemoryRateLimiter(
+        requests_per_second=float(os.getenv("LLM_RPS", rps)),
+        check_every_n_seconds=0.05,
+        max_bucket_size=int(os.getenv("LLM_BURST", burst)),
+    )
+
+
+# OpenAI 호출이 공유하는 HTTP 연결 풀 (keep-alive 재사용)
+_http_clients = {}
+
+
+def _openai_http_clients():
+    if httpx is None:
+        return {}
+    if not _http_clients:
+        pool = int(os.getenv("LLM_HTTP_POOL_SIZE", "20"))
+        limits = httpx.Limits(max_connections=pool, max_keepalive_connections=pool)
+        timeout = httpx.Timeout(float(os.getenv("LLM_TIMEOUT", "60")), connect=10.0)
+        _http_clients["http_client"] = httpx.Client(limits=limits, timeout=timeout)
+        _http_clients["http_async_client"] = httpx.AsyncClient(limits=limits, timeout=timeout)
+    return _http_clients
+
+
 def get_chat_model():
     """
     환경 변수(LLM_PROVIDER)에 따라 적절한 LangChain ChatModel 객체를 반환합니다.
+    제공자 모델은 ResilientChatModel로 감싸서 요청 제한 / 재시도 / 호출 통계를 적용합니다.
+    (LLM_RESILIENT=0이면 감싸지 않은 모델 반환)
     """
+    resilient = os.getenv("LLM_RESILIENT", "1") == "1"
+    inner = _create_chat_model(resilient)
+    if not resilient:
+        return inner
+
+    provider = os.getenv("LLM_PROVIDER", "openai").lower()
+    return ResilientChatModel(
+        inner=inner,
+        rate_limiter=_rate_limiter(provider),
+        max_attempts=int(os.getenv("LLM_MAX_ATTEMPTS", "5")),
+    )
+
+
+def _create_chat_model(resilient=True):
+    """환경 변수에 맞는 제공자 ChatModel 생성"""
     provider = os.getenv("LLM_PROVIDER", "openai").lower()  # 기본값 openai
     model_name = os.getenv("LLM_MODEL", "gpt-4o")
     temp = float(os.getenv("LLM_TEMPERATURE", "0"))
@@ -30,9 +239,12 @@ def get_chat_model():
 
     if provider == "openai":
         if not ChatOpenAI: raise ImportError("langchain-openai 패키지가 필요합니다.")
+        options = {"max_retries": 0} if resilient else {}  # 재시도는 ResilientChatModel이 담당 (이중 재시도 방지)
         return ChatOpenAI(
             model_name=model_name,
-            temperature=temp
+            temperature=temp,
+            **options,
+            **_openai_http_clients()
         )
 
     elif provider == "google":
@@ -1,27 +1,34 @@
 import os
 import time
+import asyncio
 import threading
 import queue
-import uuid
 import sys
-import csv  # [NEW] 샘플 데이터 읽기용
+import itertools
+from datetime import datetime
 from dotenv import load_dotenv
 
 # [LangChain & Neo4j]
 from langchain_community.graphs import Neo4jGraph
 from langchain_experimental.graph_transformers import LLMGraphTransformer
-from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain
-from langchain_core.prompts import PromptTemplate
 from langchain_core.documents import Document
 
 # [Custom Modules]
 from ontology_manager import OntologyManager 
-from ontology import GraphSchema
 from scenario_generator import ScenarioGenerator
 from hr_manager import HRDataManager
 from utils import load_prompt_file
 from data_generator import DataGenerator
 from llm_factory import get_chat_model
+from persistent_queue import PersistentQueue
+from extraction_cache import ExtractionCache
+from template_extractor import TemplateExtractor
+from schema_bootstrap import SchemaBootstrapper
+from graph_writer import GraphWriter
+from relationship_aggregator import RelationshipAggregator
+from schema_discovery import SchemaDiscovery
+from interaction_generator import InteractionHistoryGenerator
+from qa_engine import QAEngine
 
 # [설정] 환경 변수 로드
 load_dotenv()
@@ -40,130 +47,396 @@ graph = Neo4jGraph(
     password=os.getenv("NEO4J_PASSWORD", "password")
 )
 
-# [비동기] 데이터 대기열
-data_queue = queue.Queue()
+# [비동기] 데이터 대기열 (디스크 영속: 비정상 종료 시에도 미처리 제보를 재시작 후 이어서 처리)
+data_queue = PersistentQueue(
+    path=os.getenv("INGEST_QUEUE_PATH", "src/ingest_queue.db"),
+    max_items=int(os.getenv("INGEST_QUEUE_MAX_ITEMS", "10000")),
+    max_bytes=int(os.getenv("INGEST_QUEUE_MAX_BYTES", str(64 * 1024 * 1024))),
+)
 
 # [프롬프트 및 스키마 로드]
 QA_PROMPT_TEXT = load_prompt_file("src/prompt_qa.md")
 
 # [매니저 초기화]
-hr_manager = HRDataManager(data_queue, graph)
+hr_manager = HRDataManager(
+    data_queue, graph,
+    inference_mode=os.getenv("HR_INFERENCE_MODE", "auto"),
+    group_threshold=int(os.getenv("HR_INFERENCE_GROUP_THRESHOLD", "200")),
+)
 data_generator = DataGenerator(dummy_dir="dummy", total_count=50) 
 ontology_manager = OntologyManager(llm) # 동적 스키마 매니저
 
-# 초기 학습 지침 생성 (OntologyManager가 관리하는 스키마 기반)
-INGESTION_INSTRUCTIONS = ontology_manager.get_instruction_string()
+# [DB 스키마] 온톨로지 라벨별 유니크 제약/인덱스 보장 (스키마에 라벨이 추가되면 다시 실행)
+schema_bootstrapper = SchemaBootstrapper(graph)
+schema_bootstrapper.apply(ontology_manager.current_schema)
+ontology_manager.subscribe(lambda _version: schema_bootstrapper.apply(ontology_manager.current_schema))
+
+# [추출 캐시] 동일 본문 + 동일 스키마 + 동일 모델이면 LLM 호출 생략
+EXTRACTION_MODEL_ID = f"{os.getenv('LLM_PROVIDER', 'openai').lower()}/{os.getenv('LLM_MODEL', '')}"
+extraction_cache = ExtractionCache(
+    path=os.getenv("EXTRACTION_CACHE_PATH", "src/extraction_cache.db"),
+    max_entries=int(os.getenv("EXTRACTION_CACHE_MAX_ENTRIES", "5000")),
+    max_bytes=int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+)
+extraction_cache.invalidate(ontology_manager.schema_version)
+ontology_manager.subscribe(extraction_cache.invalidate)  # 스키마가 바뀌면 이전 버전 캐시 정리
+
+# [Fast Path] 시뮬레이터 정형 제보는 정규식으로 직접 추출
+template_extractor = TemplateExtractor()
+
+
+# [배치 설정] 한 번에 묶어서 추출할 최대 건수 / 첫 건 이후 추가 수신 대기 시간(ms)
+INGEST_BATCH_SIZE = max(1, int(os.getenv("INGEST_BATCH_SIZE", "8")))
+INGEST_LINGER_MS = max(0, int(os.getenv("INGEST_LINGER_MS", "200")))
+
+# [프롬프트 설정] 출처 관련 라벨만 담은 압축 스키마 지침 사용 여부 (0이면 기존 전체 지침)
+PROMPT_COMPACT = os.getenv("PROMPT_COMPACT", "1") == "1"
+
+# [동시성 설정] 추출 워커 수 / 동시에 진행 가능한 LLM 요청 수 상한
+INGEST_WORKERS = max(1, int(os.getenv("INGEST_WORKERS", "2")))
+LLM_MAX_CONCURRENCY = max(1, int(os.getenv("LLM_MAX_CONCURRENCY", "4")))
+
+# 모든 추출 워커가 공유하는 LLM 요청 슬롯
+llm_slots = threading.BoundedSemaphore(LLM_MAX_CONCURRENCY)
+
+# 추출 결과 + Evidence를 라벨 인덱스 기반으로 한 번에 기록하는 기록기
+evidence_writer = GraphWriter(graph)
+
+# 추출 결과 -> DB 기록 전용 대기열 (단일 Writer가 소비, 워커가 너무 앞서가지 않도록 크기 제한)
+write_queue = queue.Queue(maxsize=INGEST_WORKERS * 2)
 
 
 # ---------------------------------------------------------
 # 1. [Worker] 자율 온톨로지 학습기
 # ---------------------------------------------------------
-def ingestion_worker():
-    print("  [Loupe] 자율 학습 엔진 가동 (Dynamic Ontology 기반)")
-    
-    # 워커 시작 시점의 최신 스키마 노드 리스트 가져오기
-    current_allowed_nodes = list(ontology_manager.current_schema["nodes"].keys())
-    print(f"  적용된 스키마: {', '.join(current_allowed_nodes)} 등.")
+def drain_batch(max_items=INGEST_BATCH_SIZE, linger_ms=INGEST_LINGER_MS):
+    """
+    대기열에서 최대 max_items건을 꺼냅니다.
+    첫 건은 도착할 때까지 기다리고, 이후에는 linger_ms 동안만 추가 수신을 기다립니다.
+    """
+    batch = [data_queue.get()]
+    deadline = time.monotonic() + linger_ms / 1000
 
+    while len(batch) < max_items:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            batch.append(data_queue.get(timeout=remaining))
+        except queue.Empty:
+            break
+    return batch
+
+
+def build_transformer(source_type=None):
+    """현재 스키마 기반의 LLMGraphTransformer 생성. (transformer, 스키마 버전)을 반환"""
+    schema_version, current_allowed_nodes, instructions = ontology_manager.snapshot(source_type, compact=PROMPT_COMPACT)
     transformer = LLMGraphTransformer(
         llm=llm,
         allowed_nodes=current_allowed_nodes, # 동적 리스트 주입
         allowed_relationships=[], 
-        additional_instructions=INGESTION_INSTRUCTIONS # 위에서 생성한 지침 주입
+        additional_instructions=instructions # OntologyManager가 관리하는 스키마 기반 지침 주입
     )
+    if PROMPT_COMPACT:
+        full, compact = ontology_manager.prompt_stats(source_type, os.getenv('LLM_MODEL'))
+        print(f"  [Prompt] {source_type or '기본'} 추출 지침: {full} -> {compact} tokens (호출당)")
+    return transformer, schema_version
+
+
+def prompt_profile(source_type):
+    """transformer / 추출 캐시를 공유하는 단위 (compact 모드에서는 출처별 라벨 집합)"""
+    return ontology_manager.profile_for(source_type) if PROMPT_COMPACT else "*"
+
+
+async def extract_batch(jobs):
+    """
+    jobs: [(transformer, document), ...]
+    배치 내 문서를 동시에 추출합니다. 문서마다 llm_slots를 하나씩 점유하므로
+    워커 수와 관계없이 LLM 동시 요청 수는 LLM_MAX_CONCURRENCY를 넘지 않습니다.
+    실패한 문서는 예외 객체로 반환되어 나머지 문서 처리에 영향을 주지 않습니다.
+    """
+    async def extract_one(transformer, document):
+        await asyncio.to_thread(llm_slots.acquire)
+        try:
+            return await transformer.aprocess_response(document)
+        finally:
+            llm_slots.release()
+
+    return await asyncio.gather(*(extract_one(t, d) for t, d in jobs), return_exceptions=True)
+
+
+def extraction_worker(worker_id):
+    """
+    [Producer] 대기열에서 배치를 꺼내 LLM 추출만 수행하고, 결과는 write_queue로 넘깁니다.
+    transformer는 출처 프로필(관련 라벨 집합)별로 처음 필요할 때 만들어 재사용하고,
+    스키마 버전이 바뀌면 배치 사이에서 transformer만 다시 만듭니다. (이미 꺼낸 배치는 새 스키마로 처리)
+    """
+    transformers = {}  # profile -> transformer
+    schema_version = ontology_manager.schema_version  # 캐시 키는 transformer가 만들어진 스키마 기준
+    loop = asyncio.new_event_loop()
+
+    def transformer_for(source_type):
+        profile = prompt_profile(source_type)
+        if profile not in transformers:
+            transformers[profile], _ = build_transformer(source_type)
+        return transformers[profile]
 
     while True:
+        batch = []
         try:
-            source_type, text = data_queue.get()
-            prefix = "  [자동]" if source_type == "AUTO_GEN" else "  [제보]"
-            if source_type == "HR_DB": prefix = "  [HR]"
-            
-            print(f"\n{prefix} 수신: '{text}' -> 학습 시작...")
-            
-            documents = [Document(page_content=text)]
-            graph_documents = transformer.convert_to_graph_documents(documents)
-            
-            if graph_documents:
-                graph.add_graph_documents(graph_documents)
-                
-                # Evidence Node 생성 로직
-                evidence_id = f"EV_{int(time.time())}_{str(uuid.uuid4())[:8]}"
-                extracted_node_ids = [node.id for node in graph_documents[0].nodes]
-                
-                evidence_query = """
-                MERGE (e:Evidence {id: $ev_id})
-                SET e.text = $text, e.source = $source, e.timestamp = datetime()
-                WITH e
-                MATCH (n) WHERE n.id IN $node_ids
-                MERGE (n)-[:MENTIONED_IN]->(e)
-                """
-                graph.query(evidence_query, params={
-                    "ev_id": evidence_id, "text": text, 
-                    "source": source_type, "node_ids": extracted_node_ids
-                })
-                print(f"  [백그라운드] 학습 완료 (노드 {len(extracted_node_ids)}개 연결됨)")
-            else:
-                print(f"  [백그라운드] 정보 추출 실패")
-            
-            data_queue.task_done()
+            batch = drain_batch()
+            batch_started = time.monotonic()
+
+            if ontology_manager.schema_version != schema_version:
+                print(f"  [W{worker_id}] 스키마 변경 반영: {schema_version} -> {ontology_manager.schema_version}")
+                schema_version = ontology_manager.schema_version
+                transformers.clear()
+
+            for source_type, text in batch:
+                prefix = "  [자동]" if source_type == "AUTO_GEN" else "  [제보]"
+                if source_type == "HR_DB": prefix = "  [HR]"
+                print(f"\n{prefix} 수신(W{worker_id}): '{text}' -> 학습 시작...")
+
+            # 출처 프로필마다 지침이 다르므로 캐시 키의 모델 식별자에 프로필을 포함
+            models = [f"{EXTRACTION_MODEL_ID}#{prompt_profile(source_type)}" for source_type, _ in batch]
+
+            # 1) 정형 제보(템플릿) / 캐시 적중분은 LLM을 거치지 않음
+            # (report_id: 대기열 ack_id -> 같은 초에 들어온 동일 제보도 Event가 합쳐지지 않음)
+            results = []
+            for item, model in zip(batch, models):
+                source_type, text = item
+                results.append(
+                    template_extractor.extract(text, metadata={"source": source_type, "report_id": getattr(item, "ack_id", None)})
+                    or extraction_cache.get(text, schema_version, model, metadata={"source": source_type})
+                )
+            pending = [i for i, result in enumerate(results) if result is None]
+
+            # 2) 캐시에 없는 문서만 LLM 추출
+            if pending:
+                try:
+                    jobs = [
+                        (transformer_for(batch[i][0]), Document(page_content=batch[i][1], metadata={"source": batch[i][0]}))
+                        for i in pending
+                    ]
+                    extracted = loop.run_until_complete(extract_batch(jobs))
+                except Exception as e:
+                    extracted = [e] * len(pending)
+
+                # gather는 입력 순서를 보존하므로 extracted[k]는 batch[pending[k]]의 추출 결과입니다.
+                for i, result in zip(pending, extracted):
+                    results[i] = result
+                    if not isinstance(result, Exception) and result.nodes:
+                        extraction_cache.put(batch[i][1], schema_version, models[i], result)
+
+            write_queue.put((batch, results, batch_started))
+        except Exception as e:
+            # 워커가 죽으면 꺼낸 배치가 재시작 전까지 처리 중(state=1)으로 남으므로 되돌리고 계속 진행
+            print(f"  [W{worker_id}] 배치 처리 오류: {e}")
+            for item in batch:
+                try:
+                    data_queue.nack(item)
+                except Exception as nack_error:
+                    print(f"  [W{worker_id}] 대기열 복구 실패: {nack_error}")
+
+
+def graph_writer():
+    """
+    [Consumer] 유일한 DB 기록 스레드.
+    그래프/Evidence MERGE가 서로 경합하지 않도록 모든 쓰기를 직렬화합니다.
+    """
+    processed_total = 0
+    started_at = time.monotonic()
+
+    def settle(item, done):
+        """ack(done=True) 또는 nack 후, 예외 복구 시 다시 건드리지 않도록 표시"""
+        (data_queue.task_done if done else data_queue.nack)(item)
+        settled.add(id(item))
+
+    while True:
+        batch, results, batch_started = write_queue.get()
+        settled = set()  # 이 배치에서 ack/nack를 마친 항목
+        try:
+            ready = []
+            for item, result in zip(batch, results):
+                if isinstance(result, BaseException):  # gather가 돌려준 CancelledError 등 포함
+                    print(f"  [백그라운드 오류] {result!r}")
+                    settle(item, done=False)  # 재시도 대상으로 되돌림
+                elif result.nodes:
+                    ready.append((item, result))
+                else:
+                    print(f"  [백그라운드] 정보 추출 실패")
+                    settle(item, done=True)
+
+            if ready:
+                try:
+                    # 배치 전체를 한 번의 왕복/트랜잭션으로 기록
+                    linked = evidence_writer.write([(s, t, gd) for (s, t), gd in ready])
+                    written = list(zip(ready, linked))
+                except Exception as e:
+                    # 배치 기록 실패 시 건별로 다시 시도하여 문제 메시지만 격리
+                    print(f"  [백그라운드 오류] 배치 기록 실패, 건별 재시도: {e}")
+                    written = []
+                    for item, gd in ready:
+                        try:
+                            written.append(((item, gd), evidence_writer.write([(item[0], item[1], gd)])[0]))
+                        except Exception as e:
+                            print(f"  [백그라운드 오류] {e}")
+                            settle(item, done=False)
+
+                for (item, _), count in written:
+                    print(f"  [백그라운드] 학습 완료 (노드 {count}개 연결됨)")
+                    # Evidence까지 DB에 반영된 뒤에만 대기열에서 제거(ack)
+                    settle(item, done=True)
+
+            processed_total += len(batch)
+            batch_elapsed = time.monotonic() - batch_started
+            total_elapsed = time.monotonic() - started_at
+            print(
+                f"  [처리량] 배치 {len(batch)}건 / {batch_elapsed:.2f}s "
+                f"({len(batch) / max(batch_elapsed, 1e-6):.2f}건/s), "
+                f"누적 {processed_total}건 ({processed_total / max(total_elapsed, 1e-6):.2f}건/s)"
+            )
+            cache_stats = extraction_cache.stats()
+            print(
+                f"  [캐시] 템플릿 {template_extractor.matched}건 / "
+                f"적중 {cache_stats['hits']} / 미스 {cache_stats['misses']} "
+                f"(적중률 {cache_stats['hit_rate']:.0%}, 저장 {cache_stats['entries']}건)"
+            )
+            if hasattr(llm, "stats"):
+                llm_stats = llm.stats()
+                print(
+                    f"  [LLM] 호출 {llm_stats['calls']}회 (재시도 {llm_stats['retries']} / 오류 {llm_stats['errors']}), "
+                    f"평균 {llm_stats['avg_latency_ms']:.0f}ms, "
+                    f"토큰 입력 {llm_stats['input_tokens']} / 출력 {llm_stats['output_tokens']}"
+                )
         except Exception as e:
-            print(f"  [백그라운드 오류] {e}")
+            # 유일한 기록 스레드가 죽으면 워커가 write_queue에서 멈추므로, 남은 항목을 되돌리고 계속 진행
+            print(f"  [백그라운드 오류] 배치 기록 처리 실패: {e}")
+            for item in batch:
+                if id(item) in settled:
+                    continue
+                try:
+                    data_queue.nack(item)
+                except Exception as nack_error:
+                    print(f"  [백그라운드 오류] 대기열 복구 실패: {nack_error}")
+        finally:
+            write_queue.task_done()
 
-threading.Thread(target=ingestion_worker, daemon=True).start()
+
+def start_ingestion():
+    print("  [Loupe] 자율 학습 엔진 가동 (Dynamic Ontology 기반)")
+    current_allowed_nodes = list(ontology_manager.current_schema["nodes"].keys())
+    print(f"  적용된 스키마: {', '.join(current_allowed_nodes)} 등.")
+    print(f"  배치 모드: 최대 {INGEST_BATCH_SIZE}건 / 대기 {INGEST_LINGER_MS}ms")
+    print(f"  추출 워커 {INGEST_WORKERS}개 / LLM 동시 요청 상한 {LLM_MAX_CONCURRENCY}")
+
+    threading.Thread(target=graph_writer, daemon=True).start()
+    for worker_id in range(INGEST_WORKERS):
+        threading.Thread(target=extraction_worker, args=(worker_id,), daemon=True).start()
+
+start_ingestion()
 
 # ---------------------------------------------------------
 # 2. [Agent] QA Engine
 # ---------------------------------------------------------
+qa_engine = QAEngine(
+    llm, graph, QA_PROMPT_TEXT,
+    schema_ttl=int(os.getenv("QA_SCHEMA_TTL", "300")),
+    cache_size=int(os.getenv("QA_CYPHER_CACHE_SIZE", "256")),
+    max_rows=int(os.getenv("QA_MAX_ROWS", "10")),
+    max_context_bytes=int(os.getenv("QA_MAX_CONTEXT_BYTES", "8000")),
+    count_total=os.getenv("QA_COUNT_TOTAL", "0") == "1",
+)
+
+# 새 라벨/관계 타입이 기록되면 다음 질문 전에 스키마 재조회, 온톨로지가 바뀌면 Cypher 캐시도 폐기
+evidence_writer.subscribe(qa_engine.mark_schema_dirty)
+ontology_manager.subscribe(qa_engine.on_ontology_change)
+
 def ask_loupe(question):
-    graph.refresh_schema()
-    mapping_rules = GraphSchema.get_qa_mapping()
-    
-    CYPHER_GENERATION_TEMPLATE = f"""
-    Task: Generate Cypher statement to query a graph database.
-    [Schema]:
-    {{schema}}
-    {mapping_rules}
-    [Instructions]:
-    1. Use 'elementId()' or 'id' property.
-    2. Try to return Evidence nodes.
-    Question: {{question}}
-    """
-    
-    cypher_prompt = PromptTemplate(input_variables=["schema", "question"], template=CYPHER_GENERATION_TEMPLATE)
-    qa_prompt = PromptTemplate(input_variables=["context", "question"], template=QA_PROMPT_TEXT)
+    return qa_engine.ask(question)
 
+def ask_loupe_stream(question, offset=0):
+    """
+    CLI용: Cypher -> 결과 행 -> 답변 토큰 순으로 바로바로 출력
+    결과가 잘렸으면 다음 페이지의 offset을, 아니면 None을 반환합니다.
+    """
+    answering = False
+    next_offset = None
     try:
-        chain = GraphCypherQAChain.from_llm(
-            llm, graph=graph, verbose=True, allow_dangerous_requests=True,
-            cypher_prompt=cypher_prompt, qa_prompt=qa_prompt
-        )
-        return chain.invoke(question)
+        for kind, payload in qa_engine.stream(question, offset):
+            if kind == "cypher":
+                print(f"  [Cypher{' (캐시)' if payload['cache_hit'] else ''}] {payload['cypher']}")
+            elif kind == "row":
+                print(f"    - {payload}")
+            elif kind == "result":
+                truncated = payload["truncated"]
+                total = payload["total_rows"]
+                if truncated:
+                    next_offset = offset + payload["rows"]
+                print(
+                    f"  [결과] {payload['rows']}행 / {payload['bytes']}B "
+                    f"(질의 {payload['query_ms']}ms, 전송 {payload['transfer_ms']}ms)"
+                    + (f" - 전체 {total if total is not None else '?'}행 중 {offset + 1}~{offset + payload['rows']}행만 사용" if truncated or offset else "")
+                )
+            elif kind == "token":
+                if not answering:
+                    print("\n  답변:")
+                    answering = True
+                print(payload, end="", flush=True)
+            elif kind == "done":
+                stats = payload["cache_stats"]
+                print(f"\n\n  [Cypher 캐시] 적중률 {stats['hit_rate']:.0%} / 결과 {payload['rows']}행")
     except Exception as e:
-        return {"result": f"오류 발생: {e}"}
+        print(f"\n  오류 발생: {e}")
+    return next_offset
 
 # ---------------------------------------------------------
 # 3. [Logic] 관계 집계 엔진
 # ---------------------------------------------------------
-def aggregate_relationships():
-    print("  [시스템] 인물 간 상호작용 점수를 집계하여 관계 지도를 갱신합니다...")
-    query = """
-    MATCH (p1:Person)-[r:INTERACTED]->(p2:Person)
-    WITH p1, p2, sum(r.score) AS total_score
-    WHERE total_score IS NOT NULL
-    MERGE (p1)-[rel:RELATIONSHIP]-(p2)
-    SET rel.strength = total_score, rel.last_updated = datetime()
-    RETURN count(rel) as updated_count
-    """
-    try:
-        result = graph.query(query)
-        count = result[0]['updated_count'] if result else 0
-        print(f"  {count}쌍의 인물 관계 강도(strength)가 갱신되었습니다.")
-    except Exception as e:
-        print(f"  관계 집계 오류: {e}")
+half_life = os.getenv("RELATIONSHIP_DECAY_HALF_LIFE_DAYS")
+relationship_aggregator = RelationshipAggregator(graph, half_life_days=float(half_life) if half_life else None)
+
+def aggregate_relationships(mode="incremental"):
+    return relationship_aggregator.aggregate(mode)
+
+# [온톨로지 탐색] 대량 원문 -> 형태별 대표 문장 -> 병렬 LLM 분석 -> 빈도 포함 병합
+DISCOVERY_SAMPLE_LIMIT = int(os.getenv("DISCOVERY_SAMPLE_LIMIT", "5000"))
+schema_discovery = SchemaDiscovery(
+    ontology_manager, graph,
+    chunk_size=int(os.getenv("DISCOVERY_CHUNK_SIZE", "20")),
+    max_shapes=int(os.getenv("DISCOVERY_MAX_SHAPES", "200")),
+    max_workers=LLM_MAX_CONCURRENCY,
+    llm_slots=llm_slots,
+)
 
 # ---------------------------------------------------------
 # 4. [Main] 사용자 인터페이스
 # ---------------------------------------------------------
+def ask_number(prompt, cast=int, allow_zero=True):
+    """숫자를 입력할 때까지 다시 묻습니다. (엔터: None) 잘못된 입력으로 CLI와 워커가 종료되지 않도록 함"""
+    while True:
+        raw = input(prompt).strip()
+        if not raw:
+            return None
+        try:
+            value = cast(raw)
+            if value > 0 or (allow_zero and value == 0):
+                return value
+        except ValueError:
+            pass
+        print(f"  잘못된 입력입니다: '{raw}' ({'0 이상의' if allow_zero else '0보다 큰'} 숫자를 입력하세요)")
+
+def env_date(name):
+    """YYYY-MM-DD 형식의 환경 변수 (없거나 형식이 틀리면 None)"""
+    value = os.getenv(name)
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        print(f"  {name}={value} 형식이 올바르지 않아 무시합니다. (예: 2026-01-01)")
+        return None
+
 if __name__ == "__main__":
     print("--- Loupe v1.0: Full Integrated System ---")
     print(f"--- Engine: {os.getenv('LLM_PROVIDER', 'Unknown').upper()} / {os.getenv('LLM_MODEL')} ---")
@@ -195,15 +468,21 @@ if __name__ == "__main__":
                 query = input("질문: ")
                 if query.strip():
                     print("  분석 중...")
-                    res = ask_loupe(query)
-                    print(f"\n  답변:\n{res['result']}")
+                    offset = ask_loupe_stream(query)
+                    while offset is not None and input("  다음 페이지를 볼까요? (y/n): ") == 'y':
+                        offset = ask_loupe_stream(query, offset)
                 
             elif choice == '3':
                 if not simulator.is_running:
                     if not os.path.exists(dummy_actors):
                         print(f"{dummy_actors}가 없습니다. ([7]번으로 더미 데이터 생성 가능)")
                     else:
-                        sim_thread = threading.Thread(target=simulator.run, daemon=True)
+                        rate = ask_number("  부하 테스트 초당 건수 (엔터: 일반 모드): ", cast=float, allow_zero=False)
+                        target = simulator.run
+                        if rate:
+                            seed = os.getenv("SIM_SEED")
+                            target = lambda: simulator.run_load(rate=rate, seed=int(seed) if seed else None)
+                        sim_thread = threading.Thread(target=target, daemon=True)
                         sim_thread.start()
                 else:
                     simulator.stop()
@@ -215,6 +494,7 @@ if __name__ == "__main__":
                         graph.query("MATCH (n) DETACH DELETE n") # 데이터 초기화
                         ontology_manager.clear() # 스키마 초기화
                         data_generator.clear() # 더미 데이터 삭제
+                        qa_engine.mark_schema_dirty()
 
                         print("  초기화 완료")
                     except Exception as e:
@@ -226,36 +506,56 @@ if __name__ == "__main__":
                 else:
                     hr_manager.load_csv(dummy_hr_data)
                     hr_manager.run_relationship_inference() # 관계 추론
+                    qa_engine.mark_schema_dirty()
 
             elif choice == '6':
                 aggregate_relationships()
                 
             elif choice == '7':
-                data_generator.generate_all_data()
+                bulk = ask_number("  대량 생성 인원 수 (엔터: 기본 더미 데이터): ", allow_zero=False)
+                if bulk:
+                    events = ask_number("  이벤트 건수 (엔터: 0): ") or 0
+                    seed = os.getenv("DATA_SEED")
+                    end = env_date("DATA_END")  # seed와 함께 주면 실행 날짜와 무관하게 같은 결과
+                    hr_file = data_generator.generate_bulk(
+                        bulk, events=events, end=end,
+                        fmt=os.getenv("DATA_FORMAT", "csv"), seed=int(seed) if seed else None,
+                    )
+                    interactions = ask_number("  상호작용 이력 건수 (엔터: 0): ")
+                    if interactions and not hr_file.endswith(".csv"):
+                        # 이전 실행의 hr_data.csv가 남아 있어도 이번 직원 목록이 아니므로 사용하지 않음
+                        print(f"  상호작용 이력은 CSV 직원 목록이 필요합니다. ({hr_file}) DATA_FORMAT=csv로 다시 생성하세요.")
+                    elif interactions:
+                        # 생성/적재 실패(제약 위반, DB 오류 등)로 CLI와 수집 스레드가 종료되지 않도록 보고만 함
+                        try:
+                            history = InteractionHistoryGenerator(seed=int(seed) if seed else None)
+                            history.generate(hr_file, interactions, end=end,
+                                             with_evidence=input("  Event/Evidence도 생성할까요? (y/n): ") == 'y')
+                            if input("  지금 DB에 적재할까요? (HR 데이터 로드[5] 이후) (y/n): ") == 'y':
+                                history.load(graph)
+                        except Exception as e:
+                            print(f"  상호작용 이력 생성/적재 실패: {e}")
+                else:
+                    data_generator.generate_all_data()
 
             elif choice == '8':
-                print("  최근 시나리오 데이터를 분석하여 스키마 확장을 시도합니다...")
-                samples = []
-                
-                if os.path.exists(dummy_actions):
-                     with open(dummy_actions, 'r', encoding='utf-8-sig') as f:
-                        reader = csv.DictReader(f)
-                        for i, row in enumerate(reader):
-                            if i >= 5: break
-                            samples.append(f"장소 {row['location']}에서 {row['target_group']} 그룹이 '{row['action']}' 행동을 함.")
-                
-                if samples:
-                    suggestion = ontology_manager.discover_schema(samples)
-                    if suggestion:
-                        print("\n AI가 제안한 스키마 변경안:")
-                        print(suggestion)
-                        if input("  이 변경사항을 적용하시겠습니까? (y/n): ") == 'y':
-                            ontology_manager.update_schema(suggestion)
-                            print("  주의: 변경된 스키마를 적용하려면 프로그램을 재시작해주세요.")
-                    else:
-                        print("  현재 데이터로는 새로운 스키마가 필요하지 않습니다.")
+                print("  누적된 Evidence와 시나리오 데이터를 분석하여 스키마 확장을 시도합니다...")
+                texts = itertools.chain(
+                    schema_discovery.iter_evidence(limit=DISCOVERY_SAMPLE_LIMIT),
+                    schema_discovery.iter_actions_csv(dummy_actions, limit=DISCOVERY_SAMPLE_LIMIT),
+                )
+                suggestion = schema_discovery.discover(texts)
+                if suggestion:
+                    counts = suggestion["counts"]
+                    print("\n AI가 제안한 스키마 변경안 (괄호: 뒷받침하는 원문 수):")
+                    for label, spec in suggestion["new_nodes"].items():
+                        print(f"  - [Node] {label} ({counts['nodes'][label]}): {spec.get('description', '')}")
+                    for rel in suggestion["new_relationships"]:
+                        print(f"  - [Rel]  {rel} ({counts['relationships'][rel]})")
+                    if input("  이 변경사항을 적용하시겠습니까? (y/n): ") == 'y':
+                        ontology_manager.update_schema(suggestion)
                 else:
-                    print(f" 분석할 {dummy_actions} 파일이 없습니다. ([7]번으로 생성 가능)")
+                    print("  현재 데이터로는 새로운 스키마가 필요하지 않습니다. (샘플이 없으면 [7]번으로 생성 가능)")
 
             elif choice == 'q':
                 if simulator.is_running: simulator.stop()
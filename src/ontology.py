@@ -106,4 +106,9 @@ class GraphSchema:
            - **Name**: Use property 'name'
            - **Team**: Use property 'team'
            - **Role**: Use property 'role'
+        [Co-membership]:
+           - CO_WORKER / ALUMNI edges are NOT created for large groups (Organization/Major with 'virtual_relation').
+           - To find co-workers or alumni, match the shared group instead:
+             (p1:Person)-[:WORKS_FOR]->(:Organization)<-[:WORKS_FOR]-(p2:Person)
+             (p1:Person)-[:STUDIED]->(:Major)<-[:STUDIED]-(p2:Person)
         """
\ No newline at end of file
@@ -1,13 +1,127 @@
 import json
 import os
+import re
+import copy
+import hashlib
+import threading
 from langchain_core.prompts import PromptTemplate
 from ontology import GraphSchema  # [Factory Default]
+from utils import count_tokens
+
+# 출처별로 추출 대상이 되는 라벨 (compact 모드에서 이 라벨과 그 사이의 관계만 프롬프트에 포함)
+# Evidence는 GraphWriter가 원문으로 직접 만들므로 LLM 추출 대상에서 제외합니다.
+# 여기에 없는 출처는 전체 라벨을, 온톨로지 확장으로 새로 생긴 라벨은 모든 출처에 포함합니다.
+SOURCE_LABELS = {
+    "HR_DB": ["Person", "Organization", "Certificate"],
+    "SYSTEM": ["Event"],
+    "APP_LOG": ["Person", "Event"],
+    "FINANCE": ["Person", "Event", "Organization"],
+    "AUTO_GEN": ["Person", "Event", "Organization"],
+    "USER": ["Person", "Event", "Organization", "Certificate"],
+}
+
+# 노드 패턴 '(Label' 또는 '(Label:SubType' 에서 라벨 추출
+_REL_LABEL = re.compile(r"\((\w+)")
+
+# 기본 스키마(ontology.py)의 라벨. 온톨로지 확장으로 추가된 라벨과 구분하는 기준이므로 변경 불가
+BASE_LABELS = frozenset(GraphSchema.NODES)
+
+_COMPACT_STRATEGY = (
+    "[Rules] Use explicit IDs from text (e.g. 'sec-1001') for Person/Organization; "
+    "no ID -> skip Person, extract Event only. Prefer Event nodes linked to Person by ID. "
+    "No empty/'unknown' properties."
+)
 
 class OntologyManager:
     def __init__(self, llm, storage_file="src/schema_storage.json"):
         self.llm = llm
         self.storage_file = storage_file
         self.current_schema = self._load_schema()
+        self.schema_version = self._fingerprint()
+        self._listeners = []
+        self._lock = threading.RLock()  # 스키마 병합 중 수집 워커가 반쯤 바뀐 스키마를 읽지 않도록
+
+    def _fingerprint(self):
+        """스키마 내용 기반 버전 문자열 (내용이 같으면 항상 같은 값)"""
+        raw = json.dumps(self.current_schema, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:12]
+
+    def subscribe(self, callback):
+        """스키마 변경 시 callback(schema_version)을 호출하도록 등록합니다."""
+        self._listeners.append(callback)
+
+    def _publish(self):
+        """스키마 버전을 갱신하고 구독자(캐시, 인덱스 등)에게 변경을 알립니다."""
+        self.schema_version = self._fingerprint()
+        for callback in self._listeners:
+            try:
+                callback(self.schema_version)
+            except Exception as e:
+                print(f"  스키마 변경 알림 처리 실패: {e}")
+
+    def snapshot(self, source_type=None, compact=False):
+        """
+        수집 워커용: (스키마 버전, 허용 노드 라벨, 학습 지침)을 한 시점 기준으로 반환합니다.
+        워커는 버전이 바뀐 것을 보고 transformer만 다시 만들면 되므로 재시작이 필요 없습니다.
+        """
+        with self._lock:
+            labels = self.labels_for(source_type) if compact else list(self.current_schema["nodes"].keys())
+            return self.schema_version, labels, self.get_instruction_string(compact, source_type)
+
+    def profile_for(self, source_type):
+        """같은 라벨 집합을 쓰는 출처끼리 transformer/캐시를 공유하기 위한 키"""
+        return ",".join(sorted(self.labels_for(source_type)))
+
+    def labels_for(self, source_type):
+        """출처에 관련된 라벨 목록 (SOURCE_LABELS 기준 + 기본 스키마에 없던 확장 라벨)"""
+        nodes = self.current_schema["nodes"]
+        if source_type not in SOURCE_LABELS:
+            return list(nodes.keys())
+        wanted = set(SOURCE_LABELS[source_type])
+        return [label for label in nodes if label in wanted or label not in BASE_LABELS]
+
+    def _relationships_for(self, labels):
+        """양 끝 라벨이 모두 labels에 포함된 관계 규칙만 반환"""
+        allowed = set(labels)
+        return [
+            rel for rel in self.current_schema["relationships"]
+            if set(_REL_LABEL.findall(rel)) <= allowed
+        ]
+
+    def _compact_instruction(self, source_type):
+        """
+        토큰 절약용 지침: 출처 관련 라벨만, 한 줄짜리 정의와 공백 없는 관계 목록으로 렌더링합니다.
+        여러 라벨에 같은 설명으로 나오는 속성은 처음 한 번만 설명을 붙이고 이후에는 이름만 적습니다.
+        """
+        labels = self.labels_for(source_type)
+        nodes = self.current_schema["nodes"]
+
+        described = set()
+        lines = ["KG extraction schema. Node: description | property=description (* = unique key)"]
+        for label in labels:
+            spec = nodes[label]
+            id_key = spec.get("id_key", "id")
+            props = []
+            for prop, desc in spec.get("properties", {}).items():
+                name = f"{prop}*" if prop == id_key else prop
+                if (prop, desc) in described:
+                    props.append(name)
+                else:
+                    described.add((prop, desc))
+                    props.append(f"{name}={desc}")
+            lines.append(f"{label}: {spec.get('description', '')} | {'; '.join(props)}")
+
+        rels = json.dumps(self._relationships_for(labels), ensure_ascii=False, separators=(",", ":"))
+        lines.append(f"Rels: {rels}")
+        lines.append(_COMPACT_STRATEGY)
+        return "\n".join(lines)
+
+    def prompt_stats(self, source_type=None, model=None):
+        """지침 토큰 수 비교: (기존 전체 렌더링, compact 렌더링)"""
+        with self._lock:
+            full = self.get_instruction_string()
+            compact = self.get_instruction_string(compact=True, source_type=source_type)
+        return count_tokens(full, model), count_tokens(compact, model)
 
     def _load_schema(self):
         """
@@ -25,8 +139,9 @@ class OntologyManager:
         print("  [Ontology] 저장된 파일이 없어 기본 스키마(ontology.py)로 초기화합니다.")
 
         return {
-            "nodes": GraphSchema.NODES,
-            "relationships": GraphSchema.RELATIONSHIPS
+            # update_schema가 기본 스키마(클래스 상수)를 직접 바꾸지 않도록 복사본 사용
+            "nodes": copy.deepcopy(GraphSchema.NODES),
+            "relationships": list(GraphSchema.RELATIONSHIPS)
         }
 
     def save_schema(self):
@@ -38,8 +153,14 @@ class OntologyManager:
         except Exception as e:
             print(f"  스키마 저장 실패: {e}")
 
-    def get_instruction_string(self):
-        """Loupe 학습기용 프롬프트 생성 (동적 스키마 기반)"""
+    def get_instruction_string(self, compact=False, source_type=None):
+        """
+        Loupe 학습기용 프롬프트 생성 (동적 스키마 기반)
+        compact=True면 source_type 관련 라벨만 최소화된 형식으로 렌더링합니다.
+        """
+        if compact:
+            return self._compact_instruction(source_type)
+
         txt = "You are a Knowledge Graph Architect. Follow this Dynamic Schema strictly:\n\n"
         
         txt += "[Node Definitions]\n"
@@ -65,8 +186,12 @@ class OntologyManager:
             4. **Property Completeness**: Do not create nodes with empty or 'unknown' properties.
             """
 
-    def discover_schema(self, text_samples):
-        """[AI] 데이터 패턴 분석 및 스키마 확장 제안"""
+    def discover_schema(self, text_samples, max_samples=None):
+        """
+        [AI] 데이터 패턴 분석 및 스키마 확장 제안
+        대량 샘플은 SchemaDiscovery가 대표 문장으로 줄이고 나눠서 호출합니다. (max_samples=None이면 전부 사용)
+        샘플에는 0부터 번호를 붙이고, 제안마다 이를 뒷받침하는 샘플 번호를 "support"로 함께 받습니다.
+        """
         print(" [Architect] 데이터 패턴을 분석하여 온톨로지 확장을 시도합니다...")
 
         prompt_template = """
@@ -80,6 +205,7 @@ class OntologyManager:
         
         [Task]:
         Analyze the data samples. If there are distinct entities or relationships NOT covered by the Current Schema, suggest new ones.
+        For every suggested node label and relationship, list the numbers of the samples that contain it in "support".
         
         [Output Format (JSON Only)]:
         {{
@@ -88,7 +214,11 @@ class OntologyManager:
             }},
             "new_relationships": [
                 "(SourceNode)-[:RELATIONSHIP_TYPE]->(TargetNode)"
-            ]
+            ],
+            "support": {{
+                "NodeLabel": [0, 3],
+                "(SourceNode)-[:RELATIONSHIP_TYPE]->(TargetNode)": [3]
+            }}
         }}
         If no new schema is needed, return empty JSON.
         """
@@ -100,9 +230,12 @@ class OntologyManager:
         
         chain = prompt | self.llm
         try:
-            samples_str = "\n".join(text_samples[:5]) 
+            samples_str = "\n".join(f"[{i}] {text}" for i, text in enumerate(text_samples[:max_samples]))
+            with self._lock:
+                schema_str = json.dumps(self.current_schema, ensure_ascii=False, separators=(",", ":"))
+            print(f"  [Prompt] 현재 스키마 {count_tokens(schema_str)} tokens (compact JSON)")
             response = chain.invoke({
-                "current_schema": json.dumps(self.current_schema, indent=2, ensure_ascii=False), 
+                "current_schema": schema_str, 
                 "samples": samples_str
             })
             
@@ -125,23 +258,28 @@ class OntologyManager:
         
         updated_count = 0
         
-        # 노드 병합
-        for label, spec in new_nodes.items():
-            if label not in self.current_schema["nodes"]:
-                self.current_schema["nodes"][label] = spec
-                print(f"  [New Entity] '{label}' 엔티티가 추가되었습니다.")
-                updated_count += 1
-                
-        # 관계 병합
-        for rel in new_rels:
-            if rel not in self.current_schema["relationships"]:
-                self.current_schema["relationships"].append(rel)
-                print(f"  [New Relation] 관계 규칙 추가: {rel}")
-                updated_count += 1
+        with self._lock:
+            # 노드 병합
+            for label, spec in new_nodes.items():
+                if label not in self.current_schema["nodes"]:
+                    self.current_schema["nodes"][label] = spec
+                    print(f"  [New Entity] '{label}' 엔티티가 추가되었습니다.")
+                    updated_count += 1
+                    
+            # 관계 병합
+            for rel in new_rels:
+                if rel not in self.current_schema["relationships"]:
+                    self.current_schema["relationships"].append(rel)
+                    print(f"  [New Relation] 관계 규칙 추가: {rel}")
+                    updated_count += 1
+
+            if updated_count > 0:
+                self.schema_version = self._fingerprint()
                 
         if updated_count > 0:
             self.save_schema()  # [핵심] 변경사항 파일 저장
-            print("  스키마 업데이트 및 저장이 완료되었습니다. (재시작 시 반영됨)")
+            self._publish()
+            print(f"  스키마 업데이트 및 저장이 완료되었습니다. (버전 {self.schema_version}, 수집 워커에 즉시 반영됨)")
         else:
             print("  (변동 사항 없음)")
 
@@ -151,5 +289,8 @@ class OntologyManager:
             os.remove(self.storage_file)
             print(" [Ontology Manager] 저장된 스키마가 삭제되었습니다.")
         
-        self.current_schema = self._load_schema()
+        with self._lock:
+            self.current_schema = self._load_schema()
+            self.schema_version = self._fingerprint()
+        self._publish()
         
\ No newline at end of file
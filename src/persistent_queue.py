@@ -0,0 +1,200 @@
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+# 출처별 우선순위 (숫자가 낮을수록 중요)
+# 적재 한도를 넘으면 shed_priority 이상인 출처는 버리고(shedding), 그보다 중요한 출처는 자리가 날 때까지 대기합니다.
+SOURCE_PRIORITY = {
+    "USER": 0,
+    "HR_DB": 0,
+    "FINANCE": 1,
+    "APP_LOG": 1,
+    "AUTO_GEN": 2,
+    "SYSTEM": 2,
+}
+DEFAULT_PRIORITY = 1
+
+
+class QueuedItem(tuple):
+    """
+    get()이 반환하는 (source_type, text) 튜플.
+    기존 코드처럼 언패킹해서 쓸 수 있고, ack_id로 어떤 레코드인지 추적합니다.
+    """
+    def __new__(cls, ack_id, source_type, text):
+        item = super().__new__(cls, (source_type, text))
+        item.ack_id = ack_id
+        return item
+
+
+class PersistentQueue:
+    """
+    SQLite(WAL) 기반의 영속 대기열. queue.Queue의 put / get / task_done 인터페이스를 그대로 제공합니다.
+
+    - put(): 레코드를 디스크에 기록한 뒤 반환 (프로세스가 죽어도 유실되지 않음)
+    - get(): 레코드를 '처리 중' 상태로 바꿔 반환
+    - task_done(item): Evidence 기록이 끝난 뒤 호출하면 그때 레코드를 삭제(ack)
+    - nack(item): 처리 실패 시 다시 대기 상태로 되돌림 (max_attempts 초과 시 폐기)
+    - 시작 시 '처리 중'으로 남은 레코드(비정상 종료분)는 모두 재처리 대상으로 복구됩니다.
+    """
+
+    def __init__(self, path="src/ingest_queue.db", max_items=10000, max_bytes=64 * 1024 * 1024,
+                 shed_priority=2, max_attempts=3):
+        self.path = path
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.shed_priority = shed_priority
+        self.max_attempts = max_attempts
+        self.shed_count = 0
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        self._not_full = threading.Condition(self._lock)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT NOT NULL,
+                text TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                state INTEGER NOT NULL DEFAULT 0,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                enqueued_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_items_state ON items(state, id)")
+
+        # 비정상 종료로 '처리 중(1)'에 남은 레코드를 '대기(0)'로 복구
+        replayed = self._conn.execute("UPDATE items SET state = 0 WHERE state = 1").rowcount
+        self._count, self._bytes = self._conn.execute(
+            "SELECT count(*), coalesce(sum(size), 0) FROM items"
+        ).fetchone()
+
+        if self._count:
+            print(f"  [Queue] 미처리 항목 {self._count}건 복구 (처리 중 중단된 항목 {replayed}건 포함)")
+
+    def _is_full(self, size):
+        return self._count + 1 > self.max_items or self._bytes + size > self.max_bytes
+
+    def put(self, item, block=True, timeout=None):
+        """
+        (source_type, text) 항목을 디스크에 적재합니다.
+        한도 초과 시 낮은 우선순위 출처는 버리고 False를 반환하며, 나머지는 자리가 날 때까지 대기합니다.
+        """
+        source_type, text = item
+        size = len(text.encode("utf-8"))
+        priority = SOURCE_PRIORITY.get(source_type, DEFAULT_PRIORITY)
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._not_full:
+            while self._is_full(size):
+                if priority >= self.shed_priority:
+                    self.shed_count += 1
+                    if self.shed_count % 100 == 1:
+                        print(f"  [Queue] 대기열 포화: '{source_type}' 항목 폐기 (누적 {self.shed_count}건)")
+                    return False
+                if not block:
+                    raise queue.Full
+                if deadline is None:
+                    self._not_full.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Full
+                    self._not_full.wait(remaining)
+
+            self._conn.execute(
+                "INSERT INTO items (source, text, size, enqueued_at) VALUES (?, ?, ?, ?)",
+                (source_type, text, size, time.time())
+            )
+            self._count += 1
+            self._bytes += size
+            self._not_empty.notify()
+        return True
+
+    def get(self, block=True, timeout=None):
+        """가장 오래된 대기 항목을 '처리 중'으로 바꿔 반환합니다. (queue.Queue와 동일하게 queue.Empty 발생)"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        with self._not_empty:
+            while True:
+                row = self._conn.execute(
+                    "SELECT id, source, text FROM items WHERE state = 0 ORDER BY id LIMIT 1"
+                ).fetchone()
+                if row:
+                    self._conn.execute("UPDATE items SET state = 1 WHERE id = ?", (row[0],))
+                    return QueuedItem(*row)
+
+                if not block:
+                    raise queue.Empty
+                if deadline is None:
+                    self._not_empty.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self._not_empty.wait(remaining)
+
+    def task_done(self, item=None):
+        """
+        처리 완료(ack). item을 생략하면 queue.Queue와 같이 가장 오래된 처리 중 항목을 완료 처리합니다.
+        """
+        with self._lock:
+            if item is None:
+                row = self._conn.execute(
+                    "SELECT id FROM items WHERE state = 1 ORDER BY id LIMIT 1"
+                ).fetchone()
+                if not row:
+                    raise ValueError("task_done() called too many times")
+                ack_id = row[0]
+            else:
+                ack_id = item.ack_id
+            self._delete(ack_id)
+
+    def nack(self, item):
+        """처리 실패 항목을 대기 상태로 되돌립니다. max_attempts를 넘기면 폐기합니다."""
+        with self._lock:
+            row = self._conn.execute("SELECT attempts FROM items WHERE id = ?", (item.ack_id,)).fetchone()
+            if not row:
+                return
+            if row[0] + 1 >= self.max_attempts:
+                print(f"  [Queue] {self.max_attempts}회 처리 실패로 항목을 폐기합니다: '{item[1][:40]}'")
+                self._delete(item.ack_id)
+                return
+            self._conn.execute(
+                "UPDATE items SET state = 0, attempts = attempts + 1 WHERE id = ?", (item.ack_id,)
+            )
+            self._not_empty.notify()
+
+    def _delete(self, ack_id):
+        row = self._conn.execute("SELECT size FROM items WHERE id = ?", (ack_id,)).fetchone()
+        if not row:
+            return
+        self._conn.execute("DELETE FROM items WHERE id = ?", (ack_id,))
+        self._count -= 1
+        self._bytes -= row[0]
+        self._not_full.notify_all()
+
+    def qsize(self):
+        """대기 중인(아직 꺼내지 않은) 항목 수"""
+        with self._lock:
+            return self._conn.execute("SELECT count(*) FROM items WHERE state = 0").fetchone()[0]
+
+    def empty(self):
+        return self.qsize() == 0
+
+    def stats(self):
+        with self._lock:
+            return {"items": self._count, "bytes": self._bytes, "shed": self.shed_count}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,367 @@
+import re
+import json
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_community.chains.graph_qa.cypher import GraphCypherQAChain, construct_schema, extract_cypher
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import PromptTemplate
+
+from ontology import GraphSchema
+
+
+# 서브쿼리 페이지 조회가 불가능한 Cypher 표시 (_column_cache 값)
+_UNWRAPPABLE = object()
+
+
+def _json_size(value):
+    return len(json.dumps(value, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+def shrink_value(value, budget):
+    """
+    value를 대략 budget 바이트 안으로 줄입니다. (예: RETURN collect(e.text) 처럼 한 행이 거대한 결과)
+    긴 문자열은 앞부분만, 긴 리스트는 앞쪽 항목만 남기고 생략한 개수를 표시하며, 맵은 큰 값끼리 예산을 나눕니다.
+    """
+    if _json_size(value) <= budget:
+        return value
+    marker = 48  # 생략 표시 문구 여유분
+    if isinstance(value, str):
+        return value.encode("utf-8")[:max(budget - marker, 0)].decode("utf-8", "ignore") + "…(생략)"
+    if isinstance(value, (list, tuple)):
+        kept, used = [], 2
+        for item in value:
+            size = _json_size(item) + 1
+            if used + size > budget - marker:
+                if not kept:
+                    kept.append(shrink_value(item, budget - marker))
+                break
+            kept.append(item)
+            used += size
+        omitted = len(value) - len(kept)
+        return kept + ([f"…(외 {omitted}개 생략)"] if omitted else [])
+    if isinstance(value, dict):
+        sizes = {key: _json_size(item) for key, item in value.items()}
+        share = budget // max(len(value), 1)
+        small = {key for key, size in sizes.items() if size <= share}
+        # 키/구분자 크기와 작은 값들을 먼저 빼고 남은 예산을 큰 값들에 나눔
+        rest = budget - _json_size({key: None for key in value}) - sum(sizes[key] for key in small)
+        large_share = max(rest // max(len(value) - len(small), 1), marker)
+        return {key: item if key in small else shrink_value(item, large_share) for key, item in value.items()}
+    return value
+
+
+class CypherCache:
+    """
+    [질문 -> Cypher 캐시]
+    (정규화된 질문, 스키마 지문)을 키로, 실행에 성공한 Cypher를 최근 사용 순(LRU)으로 보관합니다.
+    """
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(question):
+        """공백/대소문자/끝 문장부호 차이는 같은 질문으로 취급"""
+        return re.sub(r"\s+", " ", question).strip().rstrip("?.!？。 ").lower()
+
+    @classmethod
+    def make_key(cls, question, schema_fingerprint):
+        raw = f"{schema_fingerprint}\x1f{cls.normalize(question)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            cypher = self._entries.get(key)
+            if cypher is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cypher
+
+    def put(self, key, cypher):
+        with self._lock:
+            self._entries[key] = cypher
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self, *_):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self._entries),
+        }
+
+
+class QAEngine:
+    """
+    [Agent] 자연어 질문 -> Cypher -> 답변 생성 엔진.
+
+    GraphCypherQAChain과 프롬프트는 최초 질문 시 한 번만 만들고 재사용합니다.
+    Neo4j 스키마 조회(refresh_schema)는 매 질문마다 하지 않고,
+    - 수집 측에서 새 라벨/관계 타입이 기록되었다는 신호(mark_schema_dirty)가 왔거나
+    - 마지막 조회 후 schema_ttl초가 지났을 때만 수행합니다.
+
+    같은 질문이 반복되면 캐시된 Cypher를 바로 실행하여 Cypher 생성용 LLM 호출을 생략합니다.
+    """
+
+    # 생성된 Cypher의 마지막 RETURN에 이미 정렬이 있으면 그 순서로 페이지를 나눔
+    _ORDER_BY = re.compile(r"\bRETURN\b(?!.*\bRETURN\b).*\bORDER\s+BY\b", re.IGNORECASE | re.DOTALL)
+
+    def __init__(self, llm, graph, qa_prompt_text, schema_ttl=300, cache_size=256,
+                 max_rows=10, max_context_bytes=8000, count_total=False):
+        self.llm = llm
+        self.graph = graph
+        self.qa_prompt_text = qa_prompt_text
+        self.schema_ttl = schema_ttl
+
+        self._chain = None
+        self._schema_loaded_at = 0.0
+        self._schema_dirty = True
+        self._schema_fingerprint = ""
+        self._lock = threading.Lock()
+        self.cypher_cache = CypherCache(max_entries=cache_size)
+
+        # 결과 크기 제한: 한 페이지(= QA 프롬프트에 들어가는 결과)의 최대 행 수 / 최대 바이트
+        self.max_rows = max_rows
+        self.max_context_bytes = max_context_bytes
+        # 잘린 결과의 전체 행 수 집계는 질의를 한 번 더 실행하므로 기본 비활성
+        self.count_total = count_total
+        self._column_cache = CypherCache(max_entries=cache_size)  # Cypher -> 결과 컬럼 (페이지 정렬 기준)
+
+    def mark_schema_dirty(self, *_):
+        """다음 질문 전에 DB 스키마를 다시 읽도록 표시 (스키마 변경 알림 콜백으로 사용)"""
+        self._schema_dirty = True
+
+    def on_ontology_change(self, *_):
+        """온톨로지가 바뀌면 스키마를 다시 읽고, 이전 스키마 기준으로 만든 Cypher는 모두 폐기"""
+        self.mark_schema_dirty()
+        self.cypher_cache.clear()
+
+    def _build_chain(self):
+        mapping_rules = GraphSchema.get_qa_mapping()
+
+        CYPHER_GENERATION_TEMPLATE = f"""
+        Task: Generate Cypher statement to query a graph database.
+        [Schema]:
+        {{schema}}
+        {mapping_rules}
+        [Instructions]:
+        1. Use 'elementId()' or 'id' property.
+        2. Try to return Evidence nodes.
+        Question: {{question}}
+        """
+
+        cypher_prompt = PromptTemplate(input_variables=["schema", "question"], template=CYPHER_GENERATION_TEMPLATE)
+        qa_prompt = PromptTemplate(input_variables=["context", "question"], template=self.qa_prompt_text)
+
+        return GraphCypherQAChain.from_llm(
+            self.llm, graph=self.graph, verbose=True, allow_dangerous_requests=True,
+            cypher_prompt=cypher_prompt, qa_prompt=qa_prompt
+        )
+
+    def _get_chain(self):
+        """체인을 재사용하고, 필요할 때만 스키마를 갱신합니다."""
+        with self._lock:
+            expired = time.monotonic() - self._schema_loaded_at > self.schema_ttl
+            if self._schema_dirty or expired:
+                self.graph.refresh_schema()
+                self._schema_loaded_at = time.monotonic()
+                self._schema_dirty = False
+                if self._chain is not None:
+                    self._chain.graph_schema = construct_schema(self.graph.get_structured_schema, [], [])
+
+            if self._chain is None:
+                self._chain = self._build_chain()
+            self._schema_fingerprint = hashlib.sha256(self._chain.graph_schema.encode("utf-8")).hexdigest()[:12]
+            return self._chain
+
+    @staticmethod
+    def _output(chain, result):
+        """LLMChain(dict 반환) / Runnable(str 반환) 양쪽 호환"""
+        return result[chain.output_key] if isinstance(result, dict) else result
+
+    def _generate_cypher(self, chain, question):
+        result = chain.cypher_generation_chain.invoke({"question": question, "schema": chain.graph_schema})
+        cypher = extract_cypher(self._output(chain.cypher_generation_chain, result))
+        if chain.cypher_query_corrector:
+            cypher = chain.cypher_query_corrector(cypher)
+        return cypher
+
+    def _columns(self, cypher):
+        """결과 컬럼 이름 (결과가 없으면 None). 같은 Cypher는 다시 조회하지 않습니다."""
+        columns = self._column_cache.get(cypher)
+        if columns is None:
+            rows = self.graph.query(f"CALL () {{ {cypher} }} RETURN * LIMIT 1")
+            if not rows:
+                return None
+            columns = list(rows[0])
+            self._column_cache.put(cypher, columns)
+        return columns
+
+    def _fetch_page(self, cypher, offset, limit):
+        """
+        (행 목록, 전체 행 수 또는 None)
+        서브쿼리로 감쌀 수 없는 Cypher(예: 별칭 없는 RETURN p.name / count(*))는 Neo4j가 거부하므로,
+        원본 Cypher를 그대로 실행하고 페이지는 클라이언트에서 자릅니다. (해당 Cypher는 기억해 두고 바로 원본 실행)
+        """
+        if self._column_cache.get(cypher) is not _UNWRAPPABLE:
+            try:
+                query = self._page_query(cypher)
+                return (self.graph.query(query, params={"offset": offset, "limit": limit}) if query else []), None
+            except Exception as e:
+                print(f"  [QA] 서브쿼리 페이지 조회 실패, 원본 Cypher로 실행합니다: {e}")
+                self._column_cache.put(cypher, _UNWRAPPABLE)
+        rows = self.graph.query(cypher)
+        return rows[offset:offset + limit], len(rows)
+
+    def _page_query(self, cypher):
+        """
+        생성된 Cypher를 서브쿼리로 감싸 DB가 직접 SKIP / LIMIT 하도록 합니다.
+        페이지가 겹치거나 빠지지 않도록, 정렬이 없는 Cypher는 모든 결과 컬럼 기준으로 정렬합니다.
+        """
+        order = ""
+        if not self._ORDER_BY.search(cypher):
+            columns = self._columns(cypher)
+            if columns is None:
+                return None
+            order = " ORDER BY " + ", ".join(f"`{c.replace('`', '``')}`" for c in columns)
+        return f"CALL () {{ {cypher} }} RETURN *{order} SKIP $offset LIMIT $limit"
+
+    def _stream_rows(self, cypher, offset, meta):
+        """
+        DB에서 offset부터 한 페이지(max_rows + 1행)만 받아 하나씩 반환합니다.
+        한 행이 더 있거나 바이트 예산을 넘으면 잘린 것으로 표시합니다. (예산보다 큰 첫 행은 shrink_value로 축소)
+        meta에는 반환 행 수, 잘림 여부, 질의/전송 시간(ms), 바이트 수를 기록합니다.
+        """
+        started = time.monotonic()
+        rows, total = self._fetch_page(cypher, offset, self.max_rows + 1)
+        if total is not None:
+            meta["total_rows"] = total  # 원본을 실행했으므로 전체 행 수를 추가 비용 없이 알 수 있음
+        meta["query_ms"] = round((time.monotonic() - started) * 1000)
+        try:
+            for row in rows:
+                row_bytes = _json_size(row)
+                if meta["rows"] == 0 and row_bytes > self.max_context_bytes:
+                    # 첫 행 하나가 예산을 넘으면 통째로 넣지 않고 긴 리스트/문자열을 잘라서 사용
+                    row = shrink_value(row, self.max_context_bytes)
+                    row_bytes = _json_size(row)
+                    meta["truncated"] = True
+                over_budget = meta["rows"] >= self.max_rows or (
+                    meta["rows"] > 0 and meta["bytes"] + row_bytes > self.max_context_bytes
+                )
+                if over_budget:
+                    meta["truncated"] = True
+                    break
+                meta["rows"] += 1
+                meta["bytes"] += row_bytes
+                yield row
+        finally:
+            meta["transfer_ms"] = round((time.monotonic() - started) * 1000)
+
+    def _count_rows(self, cypher):
+        """잘린 결과의 전체 행 수 (DB 내부에서만 집계, 실패 시 None)"""
+        try:
+            result = self.graph.query(f"CALL () {{ {cypher} }} RETURN count(*) AS total")
+            return result[0]["total"] if result else None
+        except Exception:
+            return None
+
+    @staticmethod
+    def _answer_runnable(chain):
+        """LLMChain은 토큰 단위 스트리밍이 안 되므로 prompt | llm으로 다시 구성"""
+        qa_chain = chain.qa_chain
+        if hasattr(qa_chain, "prompt") and hasattr(qa_chain, "llm"):
+            return qa_chain.prompt | qa_chain.llm | StrOutputParser()
+        return qa_chain
+
+    def stream(self, question, offset=0):
+        """
+        [Streaming QA] 결과를 준비되는 순서대로 내보냅니다.
+          ("cypher", {"cypher": ..., "cache_hit": ...})  -> 생성(또는 캐시)된 Cypher
+          ("row", {...})                               -> DB 결과 행 (도착하는 대로)
+          ("result", {...})                            -> 결과 요약 (잘림 여부, 전체 행 수, 질의/전송 시간)
+          ("token", "...")                             -> 답변 토큰 (LLM이 생성하는 대로)
+          ("done", {...})                              -> 최종 요약
+
+        결과가 max_rows / max_context_bytes를 넘으면 잘라서 답변하고(다음 페이지는 offset으로 이어서 조회),
+        잘렸다는 사실과 전체 행 수를 QA 프롬프트 맨 앞에 요약으로 넣어 줍니다.
+        """
+        chain = self._get_chain()
+        key = CypherCache.make_key(question, self._schema_fingerprint)
+
+        cypher = self.cypher_cache.get(key)
+        cache_hit = cypher is not None
+        if not cache_hit:
+            cypher = self._generate_cypher(chain, question)
+        yield "cypher", {"cypher": cypher, "cache_hit": cache_hit}
+
+        context = []
+        meta = {"offset": offset, "rows": 0, "bytes": 0, "truncated": False, "total_rows": None,
+                "query_ms": 0, "transfer_ms": 0}
+        if cypher:
+            cypher = cypher.strip().rstrip(";")
+            for row in self._stream_rows(cypher, offset, meta):
+                context.append(row)
+                yield "row", row
+            if not cache_hit:
+                self.cypher_cache.put(key, cypher)  # 실행에 성공한 Cypher만 저장
+
+            if self.count_total and meta["total_rows"] is None and (meta["truncated"] or offset > 0):
+                meta["total_rows"] = self._count_rows(cypher)
+        yield "result", meta
+
+        prompt_context = context
+        if meta["truncated"] or offset > 0:
+            first = offset + 1
+            total = meta["total_rows"]
+            scope = f"전체 {total}행 중" if total is not None else ("이후 행이 더 있는 결과 중" if meta["truncated"] else "결과 중")
+            prompt_context = [{
+                "_summary": f"{scope} {first}~{first + meta['rows'] - 1}행만 제공됨 "
+                            f"(결과 크기 제한). 답변에 일부 결과임을 명시할 것."
+            }] + context
+
+        answer = []
+        for token in self._answer_runnable(chain).stream({"question": question, "context": prompt_context}):
+            answer.append(token)
+            yield "token", token
+
+        stats = self.cypher_cache.stats()
+        yield "done", {
+            "query": question,
+            "result": "".join(answer),
+            "cypher": cypher,
+            "cache_hit": cache_hit,
+            "rows": len(context),
+            "result_meta": meta,
+            "cache_stats": stats,
+        }
+
+    def ask(self, question, offset=0):
+        """스트리밍 결과를 모아 한 번에 반환 (기존 호출부 호환)"""
+        try:
+            final = {}
+            for kind, payload in self.stream(question, offset):
+                if kind == "cypher":
+                    print(f"  [Cypher{' (캐시)' if payload['cache_hit'] else ''}] {payload['cypher']}")
+                elif kind == "done":
+                    final = payload
+            stats = final["cache_stats"]
+            print(f"  [Cypher 캐시] 적중 {stats['hits']} / 미스 {stats['misses']} (적중률 {stats['hit_rate']:.0%})")
+            return final
+        except Exception as e:
+            return {"result": f"오류 발생: {e}"}
@@ -0,0 +1,110 @@
+class RelationshipAggregator:
+    """
+    [관계 집계 엔진]
+    INTERACTED 점수를 인물 쌍 단위로 합산하여 RELATIONSHIP.strength를 갱신합니다.
+
+    - full: 모든 INTERACTED를 다시 집계
+    - incremental: 마지막 집계(워터마크) 이후 기록된 INTERACTED가 있는 쌍만 다시 집계
+      (쌍 단위로 전체 합을 다시 계산하므로 같은 쌍을 두 번 처리해도 결과가 같습니다)
+    - half_life_days를 주면 오래된 상호작용일수록 점수를 반감기 기준으로 낮춰 반영합니다.
+      incremental에서도 새 상호작용이 없는 쌍의 strength를 마지막 갱신 이후 경과 시간만큼 감쇠시켜
+      모든 쌍이 같은 시점 기준이 되게 합니다. (지수 감쇠는 모든 항이 같은 비율로 줄어 합에 그대로 곱할 수 있음)
+      반감기 설정이 이전 집계와 다르면 전체 집계를 수행합니다.
+    """
+
+    STATE_ID = "relationship_aggregation"
+
+    # 워터마크를 집계 시작 시각보다 조금 이전으로 잡아, 집계 도중 커밋된 기록도 다음 실행에서 다시 확인
+    WATERMARK_LAG = "PT1M"
+
+    # 새 상호작용이 없는 쌍을 포함해 기존 관계 강도 전체를 지금 시각 기준으로 감쇠
+    DECAY_QUERY = """
+    MATCH (:Person)-[rel:RELATIONSHIP]->(:Person)
+    WHERE rel.last_updated IS NOT NULL
+    WITH rel, datetime() AS now
+    SET rel.strength = rel.strength * 0.5 ^ (duration.inSeconds(rel.last_updated, now).seconds / 86400.0 / $half_life),
+        rel.last_updated = now
+    """
+
+    def __init__(self, graph, half_life_days=None):
+        self.graph = graph
+        self.half_life_days = half_life_days
+
+    def _score_expr(self):
+        if not self.half_life_days:
+            return "r.score"
+        # 0.5 ^ (경과일 / 반감기). 발생 시각(r.time, 합성 이력)이 있으면 기록 시각보다 우선
+        return (
+            "toFloat(r.score) * 0.5 ^ "
+            "(duration.inSeconds(coalesce(r.time, r.updated_at, now), now).seconds / 86400.0 / $half_life)"
+        )
+
+    def _watermark(self):
+        """(마지막 워터마크, 마지막 집계의 반감기, 현재 DB 시각) 반환"""
+        result = self.graph.query(
+            """
+            OPTIONAL MATCH (s:LoupeState {id: $state_id})
+            RETURN s.watermark AS watermark, s.half_life_days AS half_life, datetime() AS now
+            """,
+            params={"state_id": self.STATE_ID},
+        )
+        return result[0]["watermark"], result[0]["half_life"], result[0]["now"]
+
+    def aggregate(self, mode="incremental"):
+        print("  [시스템] 인물 간 상호작용 점수를 집계하여 관계 지도를 갱신합니다...")
+
+        try:
+            watermark, last_half_life, started_at = self._watermark()
+            since = watermark if mode == "incremental" else None
+            if mode == "incremental" and since is None:
+                print("  이전 집계 기록이 없어 전체 집계를 수행합니다.")
+            elif since is not None and (last_half_life or None) != (self.half_life_days or None):
+                print("  반감기 설정이 이전 집계와 달라 전체 집계를 수행합니다.")
+                since = None
+
+            if since is not None and self.half_life_days:
+                self.graph.query(self.DECAY_QUERY, params={"half_life": self.half_life_days})
+
+            if since is None:
+                # 전체 쌍 집계
+                pairs = """
+                MATCH (p1:Person)-[:INTERACTED]-(p2:Person)
+                WHERE elementId(p1) < elementId(p2)
+                WITH DISTINCT p1, p2
+                """
+            else:
+                # 워터마크 이후 갱신된 INTERACTED가 있는 쌍만 (updated_at 관계 인덱스 사용)
+                pairs = """
+                MATCH (p1:Person)-[new:INTERACTED]-(p2:Person)
+                WHERE new.updated_at > $since AND elementId(p1) < elementId(p2)
+                WITH DISTINCT p1, p2
+                """
+
+            query = pairs + f"""
+            WITH p1, p2, datetime() AS now
+            MATCH (p1)-[r:INTERACTED]-(p2)
+            WITH p1, p2, sum({self._score_expr()}) AS total_score
+            WHERE total_score IS NOT NULL
+            MERGE (p1)-[rel:RELATIONSHIP]-(p2)
+            SET rel.strength = total_score, rel.last_updated = datetime()
+            RETURN count(rel) as updated_count
+            """
+
+            result = self.graph.query(query, params={"since": since, "half_life": self.half_life_days})
+            count = result[0]['updated_count'] if result else 0
+
+            self.graph.query(
+                f"""
+                MERGE (s:LoupeState {{id: $state_id}})
+                SET s.watermark = $started_at - duration('{self.WATERMARK_LAG}'),
+                    s.half_life_days = $half_life
+                """,
+                params={"state_id": self.STATE_ID, "started_at": started_at, "half_life": self.half_life_days},
+            )
+
+            scope = "변경된" if since is not None else "전체"
+            print(f"  {scope} {count}쌍의 인물 관계 강도(strength)가 갱신되었습니다.")
+            return count
+        except Exception as e:
+            print(f"  관계 집계 오류: {e}")
+            return 0
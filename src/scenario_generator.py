@@ -2,12 +2,16 @@ import time
 import random
 import csv
 import os
+import threading
 from datetime import datetime
 
 class ScenarioGenerator:
-    def __init__(self, data_queue):
+    def __init__(self, data_queue, seed=None):
         self.queue = data_queue
         self.is_running = False
+        self._stopped = threading.Event()
+        self.rng = random.Random(seed)  # seed 고정 시 같은 순서의 시나리오 재현 (벤치마크용)
+        self._actions_by_group = {}
         
         # 1. 기본값 (데이터 없을 때의 Fallback)
         self.actors = [{"name": "김철수", "role": "부장", "team": "보안팀", "group": "SECURITY", "id": "sec-000", "age": "50", "gender": "남성"}]
@@ -38,6 +42,20 @@ class ScenarioGenerator:
             except Exception as e:
                 print(f"  [시뮬레이터] actions.csv 로드 실패: {e}")
 
+        self._build_index()
+
+    def _build_index(self):
+        """그룹 -> 가능한 시나리오 목록을 미리 계산 (매 생성마다 전체 시나리오를 거르지 않도록)"""
+        self._actions_by_group = {}
+        for group in {actor.get('group', 'ALL') for actor in self.actors}:
+            self._actions_by_group[group] = [
+                s for s in self.scenarios
+                if s.get('target_group') == 'ALL' or s.get('target_group') == group
+            ] or self.scenarios
+
+    def seed(self, seed):
+        self.rng.seed(seed)
+
     def _get_actor_profile(self, actor):
         """
         [핵심] 온톨로지가 요구하는 속성(ID, 나이, 성별 등)을 텍스트에 모두 포함시킵니다.
@@ -57,35 +75,32 @@ class ScenarioGenerator:
 
         # 1. 주인공(Actor 1) 선택
         if not self.actors: return "데이터 없음"
-        actor1 = random.choice(self.actors)
+        rng = self.rng
+        n = len(self.actors)
+        index1 = rng.randrange(n)
+        actor1 = self.actors[index1]
         group1 = actor1.get('group', 'ALL')
         
-        # 2. 시나리오 필터링
-        possible_actions = [
-            s for s in self.scenarios 
-            if s.get('target_group') == 'ALL' or s.get('target_group') == group1
-        ]
-        
-        if not possible_actions:
-            scene = random.choice(self.scenarios)
-        else:
-            scene = random.choice(possible_actions)
+        # 2. 시나리오 선택 (그룹별 사전 계산 목록)
+        possible_actions = self._actions_by_group.get(group1)
+        if possible_actions is None:
+            self._build_index()  # actors/scenarios가 외부에서 바뀐 경우
+            possible_actions = self._actions_by_group[group1]
+        scene = rng.choice(possible_actions)
 
         # 3. [관계] 상대방(Actor 2) 선택 및 정보 구성
         category = scene.get('category', 'ETC')
         target_str = ""
         
         # 관계형 시나리오거나, 30% 확률로 일반 시나리오에도 동료가 등장하게 함 (데이터 풍부화)
-        is_relation = (category == 'RELATION') or (random.random() < 0.3)
+        is_relation = (category == 'RELATION') or (rng.random() < 0.3)
         
-        if is_relation and len(self.actors) > 1:
-            while True:
-                actor2 = random.choice(self.actors)
-                # 본인이 아닌 사람 선택
-                id1 = actor1.get('id', actor1.get('name'))
-                id2 = actor2.get('id', actor2.get('name'))
-                if id1 != id2:
-                    break
+        if is_relation and n > 1:
+            # 본인이 아닌 사람 선택: 본인을 뺀 n-1명 중 하나를 한 번에 뽑음 (재시도 없음)
+            index2 = rng.randrange(n - 1)
+            if index2 >= index1:
+                index2 += 1
+            actor2 = self.actors[index2]
             
             # [수정] 상대방 정보도 Full Profile로 제공
             target_profile = self._get_actor_profile(actor2)
@@ -113,11 +128,54 @@ class ScenarioGenerator:
     def run(self):
         print("\n  [시뮬레이터] 페르소나 기반 시나리오 생성을 시작합니다.")
         self.is_running = True
+        self._stopped.clear()
         while self.is_running:
             text = self.generate_one()
             self.queue.put(("AUTO_GEN", text))
-            time.sleep(random.randint(2, 5))
+            self._stopped.wait(self.rng.randint(2, 5))
+
+    def run_load(self, rate=None, count=None, seed=None):
+        """
+        [부하 테스트 모드]
+        - rate: 초당 목표 건수. 예정 시각(시작 + k/rate) 기준으로 보내므로 생성 시간이 늘어도 누적 오차가 없음
+        - rate 없이 count만 주면 count건을 쉬지 않고 한 번에(burst) 보냄
+        - count가 없으면 stop()까지 계속
+        대기열이 가득 차 버려진(put이 False) 건수도 함께 반환합니다.
+        """
+        if seed is not None:
+            self.seed(seed)
+        print(f"\n  [시뮬레이터] 부하 모드 시작 (목표 {f'{rate}건/s' if rate else '최대 속도'}, "
+              f"{f'{count}건' if count else '무제한'}, seed={seed})")
+
+        self.is_running = True
+        self._stopped.clear()
+        sent = shed = 0
+        started = time.monotonic()
+        report_at = started + 5
+
+        while self.is_running and (count is None or sent + shed < count):
+            if rate:
+                delay = started + (sent + shed) / rate - time.monotonic()
+                if delay > 0 and self._stopped.wait(delay):
+                    break
+            if self.queue.put(("AUTO_GEN", self.generate_one())) is False:
+                shed += 1
+            else:
+                sent += 1
+
+            now = time.monotonic()
+            if now >= report_at:
+                print(f"  [시뮬레이터] {sent}건 전송 / {shed}건 폐기 ({(sent + shed) / (now - started):.1f}건/s)")
+                report_at = now + 5
+
+        elapsed = time.monotonic() - started
+        self.is_running = False
+        stats = {"sent": sent, "shed": shed, "elapsed": elapsed,
+                 "rate": (sent + shed) / elapsed if elapsed > 0 else 0.0}
+        print(f"  [시뮬레이터] 부하 모드 종료: {sent}건 전송 / {shed}건 폐기, {elapsed:.1f}s ({stats['rate']:.1f}건/s)")
+        return stats
             
     def stop(self):
         self.is_running = False
+        self._stopped.set()
         print("\n  [시뮬레이터] 중단됨.")
\ No newline at end of file
@@ -0,0 +1,98 @@
+import re
+
+
+class SchemaBootstrapper:
+    """
+    [DB 스키마 준비]
+    온톨로지의 노드 라벨과 id_key를 읽어 Neo4j 유니크 제약조건(= 범위 인덱스 포함)을 생성합니다.
+    MERGE (n:Label {id: ...}) / MATCH (n:Label {id: ...})가 라벨 전체 스캔 대신 인덱스 조회로 동작하게 됩니다.
+    모든 구문은 IF NOT EXISTS로 실행되므로 몇 번을 호출해도 안전합니다.
+    """
+
+    # 온톨로지 밖에서 직접 적재되는 라벨 (HRDataManager / MetricBatchWriter)
+    EXTRA_LABELS = {"Major": "id", "Host": "id", "Metric": "id"}
+
+    # id 외에 자주 조회되는 속성의 범위 인덱스
+    EXTRA_INDEXES = {
+        "Person": ["name"],
+        "Event": ["time"],
+        "Evidence": ["timestamp"],
+        "Metric": ["bucket_start"],
+    }
+
+    # 관계 속성 범위 인덱스 (증분 관계 집계의 워터마크 조회용)
+    RELATIONSHIP_INDEXES = {
+        "INTERACTED": ["updated_at"],
+    }
+
+    def __init__(self, graph):
+        self.graph = graph
+        self._applied = set()
+
+    @staticmethod
+    def _name(*parts):
+        return "_".join(re.sub(r"\W", "_", p) for p in parts).lower()
+
+    @staticmethod
+    def _quote(identifier):
+        return "`" + identifier.replace("`", "") + "`"
+
+    def _create_unique(self, label, key):
+        name = self._name(label, key, "unique")
+        try:
+            self.graph.query(
+                f"CREATE CONSTRAINT {self._quote(name)} IF NOT EXISTS "
+                f"FOR (n:{self._quote(label)}) REQUIRE n.{self._quote(key)} IS UNIQUE"
+            )
+            return "constraint"
+        except Exception as e:
+            # 중복 데이터 / 동일 속성의 기존 인덱스 등으로 제약조건이 불가하면 범위 인덱스로 대체
+            print(f"  [Schema] {label}.{key} 유니크 제약 생성 불가, 인덱스로 대체합니다: {e}")
+            self._create_index(label, key)
+            return "index"
+
+    def _create_index(self, label, key):
+        name = self._name(label, key, "range")
+        self.graph.query(
+            f"CREATE RANGE INDEX {self._quote(name)} IF NOT EXISTS "
+            f"FOR (n:{self._quote(label)}) ON (n.{self._quote(key)})"
+        )
+
+    def _create_relationship_index(self, rel_type, key):
+        name = self._name(rel_type, key, "range")
+        self.graph.query(
+            f"CREATE RANGE INDEX {self._quote(name)} IF NOT EXISTS "
+            f"FOR ()-[r:{self._quote(rel_type)}]-() ON (r.{self._quote(key)})"
+        )
+
+    def apply(self, schema):
+        """현재 온톨로지 기준으로 제약조건/인덱스를 보장합니다. 새로 추가된 라벨만 실제로 실행됩니다."""
+        labels = {label: spec.get("id_key", "id") for label, spec in schema["nodes"].items()}
+        for label, key in self.EXTRA_LABELS.items():
+            labels.setdefault(label, key)
+
+        created = 0
+        for label, key in labels.items():
+            if (label, key) in self._applied:
+                continue
+            try:
+                self._create_unique(label, key)
+                for prop in self.EXTRA_INDEXES.get(label, []):
+                    self._create_index(label, prop)
+                self._applied.add((label, key))
+                created += 1
+            except Exception as e:
+                print(f"  [Schema] {label} 인덱스 생성 실패: {e}")
+
+        for rel_type, keys in self.RELATIONSHIP_INDEXES.items():
+            for key in keys:
+                if (rel_type, key) in self._applied:
+                    continue
+                try:
+                    self._create_relationship_index(rel_type, key)
+                    self._applied.add((rel_type, key))
+                except Exception as e:
+                    print(f"  [Schema] {rel_type}.{key} 인덱스 생성 실패: {e}")
+
+        if created:
+            print(f"  [Schema] {created}개 라벨의 유니크 제약/인덱스를 확인했습니다.")
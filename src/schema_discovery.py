@@ -0,0 +1,157 @@
+import re
+import csv
+import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from extraction_cache import split_timestamp
+
+# 본문의 '형태'만 남기기 위한 치환 규칙 (ID / 숫자 / 따옴표 안 값)
+_SHAPE_RULES = [
+    (re.compile(r"\b[a-z]+-\d+\b", re.IGNORECASE), "<ID>"),
+    (re.compile(r"'[^']*'"), "'<V>'"),
+    (re.compile(r"\d+(?:[.,]\d+)*"), "<N>"),
+]
+
+
+def text_shape(text):
+    """타임스탬프/ID/숫자/인용값을 지운 본문 형태. 형태가 같은 문장은 같은 스키마 정보를 가집니다."""
+    _, body = split_timestamp(text)
+    for pattern, token in _SHAPE_RULES:
+        body = pattern.sub(token, body)
+    return body
+
+
+class SchemaDiscovery:
+    """
+    [대량 온톨로지 탐색]
+    Neo4j Evidence / CSV에서 수천 건의 원문을 스트리밍으로 읽어 본문 형태(text_shape)별로 묶고,
+    형태별 대표 문장만 chunk_size개씩 나눠 병렬 LLM 호출(OntologyManager.discover_schema)로 분석한 뒤
+    제안된 노드/관계를 빈도(해당 제안을 뒷받침하는 원문 수)와 함께 하나의 제안으로 병합합니다.
+    빈도는 LLM이 제안마다 돌려준 샘플 번호(support)의 형태별 원문 수를 합산한 값이며, 묶음 전체 크기가 아닙니다.
+    """
+
+    def __init__(self, ontology_manager, graph=None, chunk_size=20, max_shapes=200, max_workers=4, llm_slots=None):
+        self.ontology_manager = ontology_manager
+        self.graph = graph
+        self.chunk_size = chunk_size
+        self.max_shapes = max_shapes
+        self.max_workers = max_workers
+        self.llm_slots = llm_slots  # 수집 워커와 LLM 동시 요청 한도를 공유할 때 전달
+
+    # -------------------------------------------------
+    # 원문 스트리밍
+    # -------------------------------------------------
+    def iter_evidence(self, limit=5000, fetch_size=500):
+        """Neo4j Evidence 원문을 최신순으로 스트리밍 (결과 전체를 메모리에 올리지 않음)"""
+        if self.graph is None:
+            return
+        with self.graph._driver.session(database=self.graph._database, fetch_size=fetch_size) as session:
+            result = session.run(
+                "MATCH (e:Evidence) WHERE e.text IS NOT NULL "
+                "RETURN e.text AS text ORDER BY e.timestamp DESC LIMIT $limit",
+                limit=limit,
+            )
+            for record in result:
+                yield record["text"]
+
+    @staticmethod
+    def iter_actions_csv(filename, limit=5000):
+        """시나리오 CSV(actions.csv)를 한 줄씩 읽어 문장으로 변환"""
+        if not os.path.exists(filename):
+            return
+        with open(filename, 'r', encoding='utf-8-sig') as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                if i >= limit:
+                    break
+                yield f"장소 {row['location']}에서 {row['target_group']} 그룹이 '{row['action']}' 행동을 함."
+
+    # -------------------------------------------------
+    # 중복 제거 / 대표 문장 선택
+    # -------------------------------------------------
+    def representatives(self, texts):
+        """
+        형태별 (대표 문장, 빈도) 목록을 빈도순으로 반환합니다.
+        같은 형태의 문장은 처음 본 것 하나만 보관하므로 메모리는 형태 수에 비례합니다.
+        """
+        counts = Counter()
+        samples = {}
+        total = 0
+        for text in texts:
+            if not text:
+                continue
+            total += 1
+            shape = text_shape(text)
+            counts[shape] += 1
+            samples.setdefault(shape, text)
+
+        top = counts.most_common(self.max_shapes)
+        print(f"  [Discovery] 원문 {total}건 -> 형태 {len(counts)}종 (상위 {len(top)}종 분석)")
+        return [(samples[shape], count) for shape, count in top]
+
+    # -------------------------------------------------
+    # 병렬 분석 / 병합
+    # -------------------------------------------------
+    def _suggest(self, chunk):
+        samples = [text for text, _ in chunk]
+        if self.llm_slots is None:
+            return self.ontology_manager.discover_schema(samples)
+        with self.llm_slots:
+            return self.ontology_manager.discover_schema(samples)
+
+    @staticmethod
+    def _support(suggestion, key, counts):
+        """제안 key를 뒷받침한다고 LLM이 지목한 샘플들의 원문 수 합 (번호가 없거나 잘못되면 0)"""
+        indices = (suggestion.get("support") or {}).get(key) or []
+        valid = {i for i in indices if isinstance(i, int) and 0 <= i < len(counts)}
+        return sum(counts[i] for i in valid)
+
+    @classmethod
+    def merge(cls, results):
+        """
+        results: [(suggestion, counts), ...]  counts[i] = 해당 chunk의 i번 대표 문장이 대표하는 원문 수
+        같은 라벨/관계가 여러 chunk에서 제안되면 빈도를 합산하고 노드 속성은 합집합으로 병합합니다.
+        """
+        nodes, node_counts = {}, Counter()
+        rel_counts = Counter()
+        for suggestion, counts in results:
+            if not suggestion:
+                continue
+            for label, spec in (suggestion.get("new_nodes") or {}).items():
+                node_counts[label] += cls._support(suggestion, label, counts)
+                if label not in nodes:
+                    nodes[label] = dict(spec, properties=dict(spec.get("properties") or {}))
+                else:
+                    for prop, desc in (spec.get("properties") or {}).items():
+                        nodes[label]["properties"].setdefault(prop, desc)
+            for rel in suggestion.get("new_relationships") or []:
+                rel_counts[rel] += cls._support(suggestion, rel, counts)
+
+        return {
+            "new_nodes": {label: nodes[label] for label, _ in node_counts.most_common()},
+            "new_relationships": [rel for rel, _ in rel_counts.most_common()],
+            "counts": {"nodes": dict(node_counts), "relationships": dict(rel_counts)},
+        }
+
+    def discover(self, texts):
+        """원문 이터러블 -> 병합된 스키마 제안 (update_schema에 그대로 전달 가능)"""
+        reps = self.representatives(texts)
+        if not reps:
+            return None
+
+        chunks = [reps[i:i + self.chunk_size] for i in range(0, len(reps), self.chunk_size)]
+        print(f"  [Discovery] {len(chunks)}개 묶음을 최대 {self.max_workers}개씩 병렬 분석합니다...")
+
+        results = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self._suggest, chunk): [c for _, c in chunk] for chunk in chunks}
+            for future in as_completed(futures):
+                try:
+                    results.append((future.result(), futures[future]))
+                except Exception as e:
+                    print(f"  [Discovery] 묶음 분석 실패: {e}")
+
+        merged = self.merge(results)
+        if not merged["new_nodes"] and not merged["new_relationships"]:
+            return None
+        return merged
@@ -0,0 +1,115 @@
+import re
+import uuid
+import hashlib
+
+from langchain_community.graphs.graph_document import GraphDocument, Node, Relationship
+from langchain_core.documents import Document
+
+# ScenarioGenerator.generate_one()이 만드는 문장 형식
+# [ts] [제보-{category}/{source}] 장소: '{where}'에서 식별된 인물 '{who}'이(가) [대상 '{target}'와(과) 함께 ]다음 행동을 수행함: {what}.
+_REPORT = re.compile(
+    r"^\[(?P<ts>[^\]]+)\] \[제보-(?P<category>[^/\]]+)/(?P<source>[^\]]+)\] "
+    r"장소: '(?P<where>.+?)'에서 식별된 인물 '(?P<who>.+?\))'이\(가\) "
+    r"(?:대상 '(?P<target>.+?\))'와\(과\) 함께 )?"
+    r"다음 행동을 수행함: (?P<what>.+)\.$"
+)
+
+# ScenarioGenerator._get_actor_profile() 형식: {team} {name} {role} (ID: {uid}, {age}세/{gender})
+_PROFILE = re.compile(
+    r"^(?P<team>.+) (?P<name>\S+) (?P<role>\S+) \(ID: (?P<id>[^,]+), (?P<age>\d+)세/(?P<gender>[^)]+)\)$"
+)
+
+# 행동 설명의 괄호 태그 -> INTERACTED 점수 (없으면 기본값)
+INTERACTION_SCORES = {
+    "친밀도 상승": 3,
+    "협력": 3,
+    "갈등 발생": -2,
+    "의심": 5,
+}
+DEFAULT_INTERACTION_SCORE = 1
+
+
+class TemplateExtractor:
+    """
+    [Fast Path] 시뮬레이터가 생성한 정형 제보 문장을 정규식으로 직접 파싱합니다.
+    형식이 일치하면 LLM 없이 Person / Event 노드와 PERFORMED / INTERACTED 관계를 만들고,
+    일치하지 않으면 None을 반환하여 LLMGraphTransformer로 넘깁니다.
+
+    제보 문장의 시각은 초 단위이므로 같은 초에 같은 내용이 여러 번 들어올 수 있습니다.
+    Event id에는 metadata["report_id"](대기열 ack_id, 재시도해도 같은 값)를 섞어 제보마다 별도 Event를 만들고,
+    report_id가 없으면 임의의 uuid를 사용합니다.
+    """
+
+    def __init__(self):
+        self.matched = 0
+        self.fallbacks = 0
+
+    @staticmethod
+    def _person(profile):
+        match = _PROFILE.match(profile)
+        if not match:
+            return None
+        return Node(
+            id=match.group("id").strip().lower(),
+            type="Person",
+            properties={
+                "name": match.group("name"),
+                "team": match.group("team"),
+                "role": match.group("role"),
+                "gender": match.group("gender"),
+                "age": int(match.group("age")),
+            },
+        )
+
+    @staticmethod
+    def _score(action):
+        for tag, score in INTERACTION_SCORES.items():
+            if tag in action:
+                return score
+        return DEFAULT_INTERACTION_SCORE
+
+    def extract(self, text, metadata=None):
+        """정형 제보면 GraphDocument, 아니면 None"""
+        match = _REPORT.match(text.strip())
+        actor = self._person(match.group("who")) if match else None
+        if not actor:
+            self.fallbacks += 1
+            return None
+
+        target = self._person(match.group("target")) if match.group("target") else None
+        if match.group("target") and not target:
+            self.fallbacks += 1
+            return None
+
+        action = match.group("what")
+        report_id = (metadata or {}).get("report_id") or uuid.uuid4().hex
+        digest = hashlib.sha1(f"{report_id}:{text}".encode("utf-8")).hexdigest()
+        event = Node(
+            id=f"evt-{digest[:12]}",
+            type="Event",
+            properties={
+                "action": action,
+                "location": match.group("where"),
+                "time": match.group("ts"),
+                "source": match.group("source"),
+                "category": match.group("category"),
+            },
+        )
+
+        nodes = [actor, event]
+        relationships = [Relationship(source=actor, target=event, type="PERFORMED")]
+
+        if target:
+            nodes.append(target)
+            relationships.append(Relationship(source=target, target=event, type="PERFORMED"))
+            relationships.append(Relationship(
+                source=actor, target=target, type="INTERACTED",
+                properties={"score": self._score(action), "action": action},
+            ))
+
+        self.matched += 1
+        return GraphDocument(
+            nodes=nodes,
+            relationships=relationships,
+            source=Document(page_content=text, metadata=metadata or {}),
+        )
@@ -16,3 +16,32 @@ def load_prompt_file(filename):
         print(f"  프롬프트 로드 오류 ({filename}): {e}")
         return ""
 
+
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+_ENCODINGS = {}
+
+
+def count_tokens(text, model=None):
+    """
+    프롬프트 토큰 수 계산 (tiktoken이 있으면 정확히, 없으면 근사치)
+    근사치: 영문/기호 약 4자당 1토큰, 한글 등 비 ASCII 문자는 1자당 1토큰
+    """
+    if not text:
+        return 0
+    if tiktoken is not None:
+        try:
+            if model not in _ENCODINGS:
+                try:
+                    _ENCODINGS[model] = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding("cl100k_base")
+                except KeyError:
+                    _ENCODINGS[model] = tiktoken.get_encoding("cl100k_base")
+            return len(_ENCODINGS[model].encode(text))
+        except Exception:
+            pass  # 인코딩 파일 다운로드 실패(오프라인) 등은 근사치로 대체
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# src/ 모듈은 평면 구조로 import됩니다. (예: from ontology_manager import OntologyManager)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
@@ -0,0 +1,36 @@
+import queue
+import time
+
+from collectors import BaseCollector, CollectorScheduler
+
+
+class CountingCollector(BaseCollector):
+    def collect(self):
+        return "tick"
+
+
+def _wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_scheduler_keeps_running_collectors_after_restart():
+    collectors = [CountingCollector(queue.Queue(), interval=0.02) for _ in range(3)]
+    scheduler = CollectorScheduler(collectors, jitter=0)
+    scheduler.start()
+    assert _wait_for(lambda: all(c.queue.qsize() >= 2 for c in collectors))
+    scheduler.stop()
+    assert not any(c.is_running for c in collectors)
+
+    before = [c.queue.qsize() for c in collectors]
+    scheduler.start()
+    try:
+        # 재시작 후 한 번만 실행되고 빠지는 수집기 없이 모두 계속 주기적으로 실행
+        assert _wait_for(lambda: all(c.queue.qsize() >= n + 3 for c, n in zip(collectors, before)))
+        assert all(c.is_running for c in collectors)
+    finally:
+        scheduler.stop()
@@ -0,0 +1,50 @@
+import pytest
+
+pytest.importorskip("langchain_core")
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+
+from llm_factory import ResilientChatModel
+
+
+class StreamingModel(GenericFakeChatModel):
+    """사용량을 마지막 청크에만 싣고, run_manager가 있으면 토큰 콜백을 직접 호출하는 제공자 모델"""
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for i, token in enumerate(["a", "b", "c"]):
+            usage = {"input_tokens": 5, "output_tokens": 3, "total_tokens": 8} if i == 2 else None
+            chunk = ChatGenerationChunk(message=AIMessageChunk(content=token, usage_metadata=usage))
+            if run_manager:
+                run_manager.on_llm_new_token(token, chunk=chunk)
+            yield chunk
+
+
+class TokenRecorder(BaseCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+
+    def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+
+
+def test_stream_records_usage_and_forwards_callbacks():
+    model = ResilientChatModel(inner=StreamingModel(messages=iter([])))
+    recorder = TokenRecorder()
+
+    content = "".join(chunk.content for chunk in model.stream("hi", config={"callbacks": [recorder]}))
+
+    assert content == "abc"
+    assert "".join(recorder.tokens) == "abc"
+    stats = model.stats()
+    assert stats["calls"] == 1
+    assert (stats["input_tokens"], stats["output_tokens"]) == (5, 3)
+
+
+def test_wrapper_keeps_langchain_post_init():
+    model = ResilientChatModel(inner=StreamingModel(messages=iter([])))
+    # BaseChatModel.model_post_init이 기록하는 버전 정보가 유지되어야 함
+    assert "lc_versions" in (model.metadata or {})
+    assert model.stats()["calls"] == 0
@@ -0,0 +1,36 @@
+from ontology import GraphSchema
+from ontology_manager import OntologyManager
+
+
+def make_manager(tmp_path):
+    return OntologyManager(llm=None, storage_file=str(tmp_path / "schema.json"))
+
+
+def test_added_label_is_included_in_compact_prompt(tmp_path):
+    manager = make_manager(tmp_path)
+    before = manager.schema_version
+
+    manager.update_schema({
+        "new_nodes": {"Vehicle": {"description": "차량", "id_key": "id", "properties": {"id": "차량 번호"}}},
+        "new_relationships": ["(Person)-[:DROVE]->(Vehicle)"],
+    })
+
+    assert manager.schema_version != before
+    assert "Vehicle" in manager.labels_for("AUTO_GEN")
+    assert "Vehicle" in manager.labels_for("HR_DB")
+    assert "Vehicle:" in manager.get_instruction_string(compact=True, source_type="AUTO_GEN")
+    assert "DROVE" in manager.get_instruction_string(compact=True, source_type="AUTO_GEN")
+
+
+def test_update_schema_does_not_modify_default_schema(tmp_path):
+    manager = make_manager(tmp_path)
+    manager.update_schema({"new_nodes": {"Vehicle": {"description": "차량", "properties": {}}}})
+
+    assert "Vehicle" not in GraphSchema.NODES
+    assert "Vehicle" not in make_manager(tmp_path / "other").current_schema["nodes"]
+
+
+def test_compact_prompt_keeps_only_source_labels(tmp_path):
+    manager = make_manager(tmp_path)
+    assert manager.labels_for("SYSTEM") == ["Event"]
+    assert set(manager.labels_for(None)) == set(GraphSchema.NODES)
@@ -0,0 +1,69 @@
+import re
+
+from qa_engine import QAEngine
+
+
+class FakeGraph:
+    """CALL 서브쿼리 안의 별칭 없는 RETURN 식을 Neo4j처럼 거부하는 가짜 그래프"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    def query(self, query, params=None):
+        self.queries.append(query)
+        inner = re.match(r"CALL \(\) \{ (.*) \} RETURN", query, re.DOTALL)
+        if inner:
+            items = inner.group(1).rsplit("RETURN", 1)[1].split(",")
+            if any(" AS " not in item.upper() for item in items):
+                raise RuntimeError("Expression in CALL { RETURN ... } must be aliased (use AS)")
+            return self.rows[params["offset"]:params["offset"] + params["limit"]] if params else self.rows[:1]
+        return list(self.rows)
+
+
+def _meta(offset=0):
+    return {"offset": offset, "rows": 0, "bytes": 0, "truncated": False, "total_rows": None,
+            "query_ms": 0, "transfer_ms": 0}
+
+
+def test_unaliased_return_falls_back_to_client_paging():
+    graph = FakeGraph([{"p.name": f"user-{i}"} for i in range(15)])
+    engine = QAEngine(None, graph, "", max_rows=10)
+    cypher = "MATCH (p:Person) RETURN p.name"
+
+    meta = _meta()
+    rows = list(engine._stream_rows(cypher, 0, meta))
+    assert [r["p.name"] for r in rows] == [f"user-{i}" for i in range(10)]
+    assert meta["truncated"] and meta["total_rows"] == 15
+
+    # 다음 페이지는 실패한 서브쿼리를 다시 시도하지 않고 원본만 실행
+    graph.queries.clear()
+    meta = _meta(10)
+    rows = list(engine._stream_rows(cypher, 10, meta))
+    assert [r["p.name"] for r in rows] == [f"user-{i}" for i in range(10, 15)]
+    assert not meta["truncated"]
+    assert graph.queries == [cypher]
+
+
+def test_aliased_return_is_paged_in_the_database():
+    graph = FakeGraph([{"name": f"user-{i}"} for i in range(15)])
+    engine = QAEngine(None, graph, "", max_rows=10)
+
+    meta = _meta()
+    rows = list(engine._stream_rows("MATCH (p:Person) RETURN p.name AS name", 0, meta))
+    assert len(rows) == 10 and meta["truncated"]
+    assert "SKIP $offset LIMIT $limit" in graph.queries[-1]
+
+
+def test_oversized_single_row_is_shrunk_to_budget():
+    texts = [f"[2026-01-01 00:00:{i % 60:02d}] 제보 원문 {i}" for i in range(20_000)]
+    graph = FakeGraph([{"texts": texts, "label": "Evidence"}])
+    engine = QAEngine(None, graph, "", max_rows=10, max_context_bytes=2000)
+
+    meta = _meta()
+    rows = list(engine._stream_rows("MATCH (e:Evidence) RETURN collect(e.text) AS texts, 'Evidence' AS label", 0, meta))
+    assert len(rows) == 1 and meta["truncated"]
+    assert meta["bytes"] <= 2000
+    assert rows[0]["label"] == "Evidence"
+    assert rows[0]["texts"][0] == texts[0]
+    assert rows[0]["texts"][-1].startswith("…(외 ")
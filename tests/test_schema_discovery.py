@@ -0,0 +1,30 @@
+from schema_discovery import SchemaDiscovery
+
+
+def test_merge_counts_support_per_sample():
+    # chunk 0: 대표 문장 3개 (원문 50/30/20건), chunk 1: 대표 문장 2개 (원문 5/1건)
+    results = [
+        ({
+            "new_nodes": {"Vehicle": {"description": "차량", "properties": {"plate": "번호판"}}},
+            "new_relationships": ["(Person)-[:DROVE]->(Vehicle)"],
+            "support": {"Vehicle": [2], "(Person)-[:DROVE]->(Vehicle)": [2]},
+        }, [50, 30, 20]),
+        ({
+            "new_nodes": {"Vehicle": {"description": "차량", "properties": {"color": "색상"}}},
+            "new_relationships": [],
+            "support": {"Vehicle": [0, 1, 1, 7]},
+        }, [5, 1]),
+    ]
+    merged = SchemaDiscovery.merge(results)
+
+    # 묶음 전체(100 + 6)가 아니라 지목된 샘플의 원문 수만 합산 (중복/범위 밖 번호는 무시)
+    assert merged["counts"]["nodes"]["Vehicle"] == 20 + 5 + 1
+    assert merged["counts"]["relationships"]["(Person)-[:DROVE]->(Vehicle)"] == 20
+    assert set(merged["new_nodes"]["Vehicle"]["properties"]) == {"plate", "color"}
+
+
+def test_merge_without_support_counts_zero():
+    results = [({"new_nodes": {"Vehicle": {"description": "차량"}}, "new_relationships": []}, [50])]
+    merged = SchemaDiscovery.merge(results)
+    assert "Vehicle" in merged["new_nodes"]
+    assert merged["counts"]["nodes"]["Vehicle"] == 0